@@ -15,4 +15,4 @@ export CLAUDE_SESSION_ID=$(echo "$INPUT" | python3 -c "import sys,json; print(js
 export CLAUDE_TRANSCRIPT_PATH=$(echo "$INPUT" | python3 -c "import sys,json; print(json.load(sys.stdin).get('transcript_path',''))" 2>/dev/null || echo "")
 
 # Run capture (hook is already async in settings.json)
-uv --directory "$PROJECT_DIR" run lcm hook capture
+uv --directory "$PROJECT_DIR" run lcm hook capture-compact
@@ -0,0 +1,32 @@
+"""JSON helpers backed by orjson when available, stdlib json otherwise.
+
+orjson is an optional dependency (install with the "speed" extra). Its
+JSONDecodeError subclasses json.JSONDecodeError, so call sites can keep
+catching the stdlib exception either way.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    def dumps_pretty(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+else:
+    loads = json.loads
+    dumps = json.dumps
+
+    def dumps_pretty(obj: Any) -> str:
+        return json.dumps(obj, indent=2)
@@ -2,53 +2,78 @@
 
 from __future__ import annotations
 
-import asyncio
 import json
 import os
 import sys
-from pathlib import Path
 
-from dotenv import load_dotenv
+USAGE = "Usage: lcm <command> [args]"
 
-from lcm.store.database import get_db
 
-# Load .env from the project root (next to pyproject.toml)
-load_dotenv(Path(__file__).resolve().parents[2] / ".env")
+def _load_env() -> None:
+    """Load .env from the project root (next to pyproject.toml)."""
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).resolve().parents[2] / ".env")
 
 
 def main() -> None:
     """Main CLI dispatcher."""
-    if len(sys.argv) < 2:
-        print("Usage: lcm <command> [args]", file=sys.stderr)
+    # Fast path: resolve help/usage/unknown-command before importing any
+    # lcm.* subpackage (hooks fire on every Claude turn, so startup matters).
+    if len(sys.argv) < 2 or sys.argv[1] in ("--help", "-h", "help"):
+        print(USAGE, file=sys.stderr)
         print("Commands: hook, status", file=sys.stderr)
-        sys.exit(1)
+        sys.exit(0 if len(sys.argv) >= 2 else 1)
 
     command = sys.argv[1]
 
     if command == "hook":
-        _handle_hook()
+        _load_env()
+        _run(_dispatch_hook())
     elif command == "status":
-        _handle_status()
+        _load_env()
+        session_id = os.environ.get("CLAUDE_SESSION_ID", "default")
+        if len(sys.argv) >= 3:
+            session_id = sys.argv[2]
+        _run(_print_status(session_id))
     else:
         print(f"Unknown command: {command}", file=sys.stderr)
         sys.exit(1)
 
 
-def _handle_hook() -> None:
+def _run(coro) -> None:
+    """Run a subcommand coroutine on a single event loop for the process."""
+    import asyncio
+
+    asyncio.run(coro)
+
+
+async def _open_db():
+    """Lazily open the shared database connection for this invocation."""
+    from lcm.store.database import get_db
+
+    return await get_db()
+
+
+async def _dispatch_hook() -> None:
     """Dispatch hook subcommands: capture, inject, init."""
     if len(sys.argv) < 3:
-        print("Usage: lcm hook <capture|inject|init>", file=sys.stderr)
+        print("Usage: lcm hook <capture|capture-compact|inject|init>", file=sys.stderr)
         sys.exit(1)
 
     subcommand = sys.argv[2]
     session_id = os.environ.get("CLAUDE_SESSION_ID", "default")
 
     if subcommand == "capture":
-        asyncio.run(_hook_capture(session_id))
+        await _hook_capture(session_id)
+    elif subcommand == "capture-compact":
+        await _hook_capture_compact(session_id)
     elif subcommand == "inject":
-        asyncio.run(_hook_inject(session_id))
+        await _hook_inject(session_id)
     elif subcommand == "init":
-        asyncio.run(_hook_init(session_id))
+        await _hook_init(session_id)
     else:
         print(f"Unknown hook subcommand: {subcommand}", file=sys.stderr)
         sys.exit(1)
@@ -58,7 +83,7 @@ async def _hook_capture(session_id: str) -> None:
     """Capture new messages from Claude Code transcript."""
     from lcm.hooks.capture import capture_new_messages
 
-    db = await get_db()
+    db = await _open_db()
     try:
         # Read transcript path from environment or auto-detect
         transcript_path = os.environ.get("CLAUDE_TRANSCRIPT_PATH")
@@ -69,11 +94,33 @@ async def _hook_capture(session_id: str) -> None:
         await db.close()
 
 
+async def _hook_capture_compact(session_id: str) -> None:
+    """Capture new messages, then compact if thresholds are crossed.
+
+    Runs both steps on one connection and event loop — invoking capture and
+    compact as separate hook processes pays two full DB lifecycles per turn.
+    """
+    from lcm.compaction.engine import check_and_compact
+    from lcm.hooks.capture import capture_new_messages
+
+    db = await _open_db()
+    try:
+        transcript_path = os.environ.get("CLAUDE_TRANSCRIPT_PATH")
+        result = await capture_new_messages(db, session_id, transcript_path)
+        stats = await check_and_compact(db, session_id)
+        if result.get("captured", 0) > 0 or stats.leaf_summaries_created:
+            result["leaf_summaries_created"] = stats.leaf_summaries_created
+            result["condensed_summaries_created"] = stats.condensed_summaries_created
+            print(json.dumps(result), file=sys.stderr)
+    finally:
+        await db.close()
+
+
 async def _hook_inject(session_id: str) -> None:
     """Inject summary context after compaction."""
     from lcm.hooks.inject import build_injection_text
 
-    db = await get_db()
+    db = await _open_db()
     try:
         text = await build_injection_text(db, session_id)
         if text:
@@ -85,7 +132,7 @@ async def _hook_inject(session_id: str) -> None:
 
 async def _hook_init(session_id: str) -> None:
     """Initialize LCM for a new session."""
-    db = await get_db()
+    db = await _open_db()
     try:
         # Just ensure the database is initialized
         from lcm.store.messages import count_messages
@@ -98,19 +145,10 @@ async def _hook_init(session_id: str) -> None:
         await db.close()
 
 
-def _handle_status() -> None:
-    """Print session status."""
-    session_id = os.environ.get("CLAUDE_SESSION_ID", "default")
-    if len(sys.argv) >= 3:
-        session_id = sys.argv[2]
-
-    asyncio.run(_print_status(session_id))
-
-
 async def _print_status(session_id: str) -> None:
     from lcm.tools.status import lcm_status
 
-    db = await get_db()
+    db = await _open_db()
     try:
         result = await lcm_status(db, session_id)
         print(json.dumps(result, indent=2))
@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import io
 from dataclasses import dataclass
 
 import aiosqlite
 
-from lcm.compaction.escalation import escalated_summarize
+from lcm.compaction.escalation import EscalationResult, escalated_summarize
 from lcm.store.messages import Message, get_unsummarized_messages, total_tokens
 from lcm.store.summaries import (
     create_condensed_summary,
@@ -20,6 +23,7 @@ TAU_HARD = 200_000
 BLOCK_SIZE_MIN = 5
 BLOCK_SIZE_MAX = 15
 CONDENSATION_THRESHOLD = 5  # Condense when 5+ uncondensed leaf summaries exist
+SUMMARIZE_CONCURRENCY = 8  # Max in-flight LLM calls during blocking compaction
 
 
 @dataclass
@@ -54,7 +58,12 @@ async def check_and_compact(
     # DAG condensation: condense leaf summaries if enough exist
     stats = await _condense_if_needed(db, session_id, model=model, stats=stats)
 
-    stats.total_tokens_after = await total_tokens(db, session_id)
+    # The message store is append-only, so the aggregate only moves if this
+    # pass actually wrote something — skip the second round-trip otherwise.
+    if stats.leaf_summaries_created or stats.condensed_summaries_created:
+        stats.total_tokens_after = await total_tokens(db, session_id)
+    else:
+        stats.total_tokens_after = stats.total_tokens_before
     return stats
 
 
@@ -93,38 +102,90 @@ async def _compact_all(
     if not unsummarized:
         return stats
 
-    # Split into blocks
+    # Split into blocks and fan out the independent LLM calls. DB writes
+    # stay serialized below to avoid interleaving aiosqlite writers.
     blocks = _split_into_blocks(unsummarized)
-    for block in blocks:
-        await _summarize_block(db, session_id, block, model=model)
+    semaphore = asyncio.Semaphore(SUMMARIZE_CONCURRENCY)
+
+    async def _summarize(block: list[Message]) -> EscalationResult:
+        async with semaphore:
+            return await _summarize_block_content(block, model=model)
+
+    results = await asyncio.gather(*(_summarize(block) for block in blocks))
+
+    for block, result in zip(blocks, results):
+        await create_leaf_summary(
+            db=db,
+            session_id=session_id,
+            content=result.content,
+            msg_start_id=block[0].id,
+            msg_end_id=block[-1].id,
+            mode=result.mode,
+            token_estimate=result.token_estimate,
+        )
         stats.leaf_summaries_created += 1
 
     return stats
 
 
 def _split_into_blocks(messages: list[Message]) -> list[list[Message]]:
-    """Split messages into blocks of BLOCK_SIZE_MIN to BLOCK_SIZE_MAX."""
+    """Split messages into blocks of BLOCK_SIZE_MIN to BLOCK_SIZE_MAX.
+
+    Walks the list by index so no intermediate copies are made — the old
+    remaining = remaining[BLOCK_SIZE_MAX:] re-sliced the tail every pass.
+    """
     blocks: list[list[Message]] = []
-    remaining = list(messages)
+    n = len(messages)
+    i = 0
 
-    while remaining:
-        if len(remaining) <= BLOCK_SIZE_MAX:
-            blocks.append(remaining)
+    while i < n:
+        remaining = n - i
+        if remaining <= BLOCK_SIZE_MAX:
+            blocks.append(messages[i:])
             break
 
         # If remaining is just slightly over max, split more evenly
-        if len(remaining) <= BLOCK_SIZE_MAX * 2:
-            mid = len(remaining) // 2
-            blocks.append(remaining[:mid])
-            blocks.append(remaining[mid:])
+        if remaining <= BLOCK_SIZE_MAX * 2:
+            mid = i + remaining // 2
+            blocks.append(messages[i:mid])
+            blocks.append(messages[mid:])
             break
 
-        blocks.append(remaining[:BLOCK_SIZE_MAX])
-        remaining = remaining[BLOCK_SIZE_MAX:]
+        blocks.append(messages[i : i + BLOCK_SIZE_MAX])
+        i += BLOCK_SIZE_MAX
 
     return blocks
 
 
+async def _summarize_block_content(
+    block: list[Message],
+    model: str | None = None,
+) -> EscalationResult:
+    """Summarize a block of messages (LLM only, no DB writes)."""
+    # Build the content to summarize into one buffer — an f-string per
+    # message allocates an intermediate copy of each (large) content value
+    buf = io.StringIO()
+    write = buf.write
+    for i, msg in enumerate(block):
+        if i:
+            write("\n\n")
+        write("[")
+        write(msg.role)
+        write("]: ")
+        write(msg.content)
+    full_content = buf.getvalue()
+
+    # Escalated summarization — reuse the stored per-message token estimates
+    # instead of re-deriving the block estimate from the joined content.
+    block_estimate = sum(msg.token_estimate for msg in block)
+    return await escalated_summarize(
+        full_content,
+        target_tokens=500,
+        model=model,
+        original_estimate=max(1, block_estimate),
+    )
+
+
 async def _summarize_block(
     db: aiosqlite.Connection,
     session_id: str,
@@ -132,14 +193,7 @@ async def _summarize_block(
     model: str | None = None,
 ) -> int:
     """Create a leaf summary for a block of messages."""
-    # Build the content to summarize
-    content_parts = []
-    for msg in block:
-        content_parts.append(f"[{msg.role}]: {msg.content}")
-    full_content = "\n\n".join(content_parts)
-
-    # Escalated summarization
-    result = await escalated_summarize(full_content, target_tokens=500, model=model)
+    result = await _summarize_block_content(block, model=model)
 
     summary_id = await create_leaf_summary(
         db=db,
@@ -166,16 +220,30 @@ async def _condense_if_needed(
     if len(uncondensed) < CONDENSATION_THRESHOLD:
         return stats
 
-    # Combine all uncondensed leaf summaries into one condensed node
+    # Combine all uncondensed leaf summaries into one condensed node.
+    # Identical leaf content (retries and re-runs can produce duplicate
+    # blocks) goes to the LLM once; the duplicates still become children.
     content_parts = []
     child_ids = []
+    kept_estimate = 0
+    seen_hashes: set[str] = set()
     for s in uncondensed:
-        content_parts.append(s.content)
         child_ids.append(s.id)
+        digest = hashlib.sha256(s.content.encode()).hexdigest()
+        if digest in seen_hashes:
+            continue
+        seen_hashes.add(digest)
+        content_parts.append(s.content)
+        kept_estimate += s.token_estimate
 
     full_content = "\n\n---\n\n".join(content_parts)
 
-    result = await escalated_summarize(full_content, target_tokens=800, model=model)
+    result = await escalated_summarize(
+        full_content,
+        target_tokens=800,
+        model=model,
+        original_estimate=max(1, kept_estimate),
+    )
 
     await create_condensed_summary(
         db=db,
@@ -2,10 +2,30 @@
 
 from __future__ import annotations
 
+import hashlib
+from collections import OrderedDict
 from dataclasses import dataclass
 
 from lcm.llm.client import summarize
 
+# In-process LRU of LLM summarization results, keyed by content hash.
+# Retries and re-condensation frequently re-summarize identical content;
+# each hit avoids a full API round-trip.
+_CACHE_MAX_ENTRIES = 256
+_result_cache: OrderedDict[str, EscalationResult] = OrderedDict()
+
+
+def _cache_key(content: str, target_tokens: int, model: str | None) -> str:
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    return f"{digest}:{target_tokens}:{model or ''}"
+
+
+def _cache_put(key: str, result: EscalationResult) -> None:
+    _result_cache[key] = result
+    _result_cache.move_to_end(key)
+    while len(_result_cache) > _CACHE_MAX_ENTRIES:
+        _result_cache.popitem(last=False)
+
 
 @dataclass
 class EscalationResult:
@@ -32,14 +52,19 @@ async def escalated_summarize(
     content: str,
     target_tokens: int = 500,
     model: str | None = None,
+    original_estimate: int | None = None,
 ) -> EscalationResult:
     """Try three escalation levels, returning the first that achieves size reduction.
 
     Level 1: Haiku with preserve_details, target T tokens
     Level 2: Haiku with bullet_points, target T/2 tokens
     Level 3: Deterministic truncation to 512 tokens (no LLM)
+
+    Callers that already hold token estimates (e.g. from the messages table)
+    can pass original_estimate to skip re-deriving it.
     """
-    original_estimate = max(1, len(content) // 4)
+    if original_estimate is None:
+        original_estimate = max(1, len(content) // 4)
 
     # If already small enough, return as-is
     if original_estimate <= target_tokens:
@@ -50,6 +75,12 @@ async def escalated_summarize(
             token_estimate=original_estimate,
         )
 
+    cache_key = _cache_key(content, target_tokens, model)
+    cached = _result_cache.get(cache_key)
+    if cached is not None:
+        _result_cache.move_to_end(cache_key)
+        return cached
+
     kwargs = {}
     if model:
         kwargs["model"] = model
@@ -61,12 +92,14 @@ async def escalated_summarize(
         )
         estimate = max(1, len(result) // 4)
         if estimate < original_estimate:
-            return EscalationResult(
+            escalated = EscalationResult(
                 content=result,
                 level=1,
                 mode="preserve_details",
                 token_estimate=estimate,
             )
+            _cache_put(cache_key, escalated)
+            return escalated
     except Exception:
         pass  # Fall through to next level
 
@@ -80,16 +113,19 @@ async def escalated_summarize(
         )
         estimate = max(1, len(result) // 4)
         if estimate < original_estimate:
-            return EscalationResult(
+            escalated = EscalationResult(
                 content=result,
                 level=2,
                 mode="bullet_points",
                 token_estimate=estimate,
             )
+            _cache_put(cache_key, escalated)
+            return escalated
     except Exception:
         pass  # Fall through to next level
 
-    # Level 3: Deterministic truncation
+    # Level 3: Deterministic truncation. Not cached — it is cheap to
+    # recompute, and a later call should get another shot at the LLM levels.
     result = _truncate_deterministic(content, max_tokens=512)
     estimate = max(1, len(result) // 4)
     return EscalationResult(
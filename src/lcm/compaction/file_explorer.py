@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
 import csv
 import io
+import itertools
 import json
 import os
 from pathlib import Path
 
+from lcm import _json
 from lcm.llm.client import summarize
 
 # Extensions handled deterministically (no LLM needed)
@@ -17,6 +20,37 @@ DETERMINISTIC_TYPES = {".json", ".csv", ".tsv", ".jsonl", ".ndjson"}
 CODE_TYPES = {".py", ".js", ".ts", ".tsx", ".jsx", ".go", ".rs", ".java", ".rb"}
 
 
+async def analyze_files(
+    file_paths: list[str],
+    model: str | None = None,
+    concurrency: int = 8,
+) -> list[dict[str, str | int | None]]:
+    """Analyze several files concurrently.
+
+    Fans out analyze_file under a bounded semaphore so the LLM-backed
+    analyses overlap instead of running one round-trip at a time. Results
+    are returned in input order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(file_path: str) -> dict[str, str | int | None]:
+        async with semaphore:
+            return await analyze_file(file_path, model=model)
+
+    return list(await asyncio.gather(*(_one(p) for p in file_paths)))
+
+
+def _read_head(path: Path, max_chars: int) -> str:
+    """Read at most max_chars characters from the head of a file.
+
+    Reads 4x max_chars bytes (worst-case UTF-8) and trims after decoding,
+    instead of decoding the entire file just to slice off a prefix.
+    """
+    with path.open("rb") as f:
+        data = f.read(max_chars * 4)
+    return data.decode("utf-8", errors="replace")[:max_chars]
+
+
 async def analyze_file(
     file_path: str, model: str | None = None
 ) -> dict[str, str | int | None]:
@@ -53,7 +87,7 @@ async def analyze_file(
 def _analyze_deterministic(path: Path, suffix: str) -> str:
     """Deterministic analysis for structured data files."""
     try:
-        content = path.read_text(errors="replace")[:50_000]  # Cap read
+        content = _read_head(path, 50_000)
 
         if suffix == ".json":
             return _analyze_json(content)
@@ -72,70 +106,101 @@ def _analyze_deterministic(path: Path, suffix: str) -> str:
 def _analyze_json(content: str) -> str:
     """Extract schema and shape from JSON."""
     try:
-        data = json.loads(content)
+        data = _json.loads(content)
         return f"JSON: {_describe_shape(data)}"
     except json.JSONDecodeError as e:
         return f"Invalid JSON: {e}"
 
 
 def _analyze_csv(content: str, delimiter: str) -> str:
-    """Extract schema and row count from CSV/TSV."""
-    reader = csv.reader(io.StringIO(content), delimiter=delimiter)
-    rows = list(reader)
-    if not rows:
+    """Extract schema and row count from CSV/TSV.
+
+    Only the header line goes through the csv module (for correct quote
+    handling); rows are counted from newlines without materializing them.
+    """
+    if not content.strip():
         return "Empty CSV"
-    headers = rows[0]
-    return f"CSV: {len(rows)-1} rows, columns: {headers}"
+    header_line = content.split("\n", 1)[0].rstrip("\r")
+    headers = next(csv.reader(io.StringIO(header_line), delimiter=delimiter))
+    line_count = content.count("\n")
+    if not content.endswith("\n"):
+        line_count += 1
+    return f"CSV: {line_count - 1} rows, columns: {headers}"
 
 
 def _analyze_jsonl(content: str) -> str:
     """Analyze JSONL: count lines, extract schema from first entry."""
-    lines = [l for l in content.strip().split("\n") if l.strip()]
-    if not lines:
+    stripped = content.strip()
+    if not stripped:
         return "Empty JSONL"
+    line_count = stripped.count("\n") + 1
+    first_line = stripped.split("\n", 1)[0]
     try:
-        first = json.loads(lines[0])
-        shape = _describe_shape(first)
-        return f"JSONL: {len(lines)} lines, first entry schema: {shape}"
+        shape = _describe_shape(_json.loads(first_line))
+        return f"JSONL: {line_count} lines, first entry schema: {shape}"
     except json.JSONDecodeError:
-        return f"JSONL: {len(lines)} lines (parse error on first)"
+        return f"JSONL: {line_count} lines (parse error on first)"
 
 
 def _describe_shape(obj: object, depth: int = 0, max_depth: int = 3) -> str:
-    """Recursively describe the shape/schema of a JSON object."""
-    if depth >= max_depth:
-        return "..."
-
-    if isinstance(obj, dict):
-        if not obj:
-            return "{}"
-        items = []
-        for k, v in list(obj.items())[:10]:
-            items.append(f"{k}: {_describe_shape(v, depth + 1, max_depth)}")
-        suffix = ", ..." if len(obj) > 10 else ""
-        return "{" + ", ".join(items) + suffix + "}"
-    elif isinstance(obj, list):
-        if not obj:
-            return "[]"
-        return f"[{_describe_shape(obj[0], depth + 1, max_depth)}] ({len(obj)} items)"
-    elif isinstance(obj, str):
-        return "str"
-    elif isinstance(obj, bool):
-        return "bool"
-    elif isinstance(obj, int):
-        return "int"
-    elif isinstance(obj, float):
-        return "float"
-    elif obj is None:
-        return "null"
-    return type(obj).__name__
+    """Describe the shape/schema of a JSON object.
+
+    Iterative traversal with an explicit stack: frames are either literal
+    output fragments (str) or (obj, depth) pairs still to be described.
+    Avoids recursion and per-level intermediate joins on nested JSON.
+    """
+    parts: list[str] = []
+    stack: list[str | tuple[object, int]] = [(obj, depth)]
+
+    while stack:
+        frame = stack.pop()
+        if type(frame) is str:
+            parts.append(frame)
+            continue
+
+        o, d = frame
+        if d >= max_depth:
+            parts.append("...")
+        elif type(o) is dict:
+            if not o:
+                parts.append("{}")
+                continue
+            parts.append("{")
+            stack.append(", ...}" if len(o) > 10 else "}")
+            # Push the first 10 items in reverse so they pop in order
+            items = list(itertools.islice(o.items(), 10))
+            for i in range(len(items) - 1, -1, -1):
+                k, v = items[i]
+                stack.append((v, d + 1))
+                stack.append(f"{k}: " if i == 0 else f", {k}: ")
+        elif type(o) is list:
+            if not o:
+                parts.append("[]")
+                continue
+            parts.append("[")
+            stack.append(f"] ({len(o)} items)")
+            stack.append((o[0], d + 1))
+        elif type(o) is str:
+            parts.append("str")
+        elif type(o) is bool:
+            parts.append("bool")
+        elif type(o) is int:
+            parts.append("int")
+        elif type(o) is float:
+            parts.append("float")
+        elif o is None:
+            parts.append("null")
+        else:
+            parts.append(type(o).__name__)
+
+    return "".join(parts)
 
 
 async def _analyze_code(
     path: Path, suffix: str, model: str | None = None
 ) -> str:
     """LLM-powered analysis for code files — extract signatures and structure."""
-    content = path.read_text(errors="replace")[:30_000]
+    content = _read_head(path, 30_000)
 
     prompt_text = (
         f"Analyze this {suffix} file and list:\n"
@@ -167,7 +232,7 @@ async def _analyze_code(
 async def _analyze_generic(path: Path, model: str | None = None) -> str:
     """LLM-powered analysis for other file types."""
     try:
-        content = path.read_text(errors="replace")[:20_000]
+        content = _read_head(path, 20_000)
     except Exception:
         return f"Binary or unreadable file: {path.name}"
 
@@ -2,52 +2,77 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 from pathlib import Path
 
 import aiosqlite
 
-from lcm.store.messages import insert_message
+from lcm import _json
+from lcm.store.messages import insert_messages_bulk
 
 # State file tracks last-processed position per session
 DEFAULT_STATE_DIR = Path.home() / ".lcm" / "state"
 
 
-def _state_file(session_id: str, state_dir: Path = DEFAULT_STATE_DIR) -> Path:
+@functools.lru_cache(maxsize=64)
+def _ensure_state_dir(state_dir: Path) -> Path:
+    """Create the state dir once per process — mkdir stats it on every call."""
     state_dir.mkdir(parents=True, exist_ok=True)
-    return state_dir / f"{session_id}.pos"
+    return state_dir
+
+
+def _state_file(session_id: str, state_dir: Path = DEFAULT_STATE_DIR) -> Path:
+    return _ensure_state_dir(state_dir) / f"{session_id}.pos"
 
 
-def _get_last_position(session_id: str, state_dir: Path = DEFAULT_STATE_DIR) -> int:
-    """Get the last-processed line number for a session."""
+def _get_last_position(
+    session_id: str, state_dir: Path = DEFAULT_STATE_DIR
+) -> tuple[int, bool]:
+    """Get the last-processed position for a session.
+
+    Returns (position, is_bytes). New-format state files store a byte offset
+    prefixed with "b"; legacy files stored a plain line number, which callers
+    migrate by scanning that many lines once.
+    """
     sf = _state_file(session_id, state_dir)
     if sf.exists():
+        raw = sf.read_text().strip()
+        is_bytes = raw.startswith("b")
         try:
-            return int(sf.read_text().strip())
+            return int(raw[1:] if is_bytes else raw), is_bytes
         except ValueError:
-            return 0
-    return 0
+            return 0, True
+    return 0, True
 
 
 def _set_last_position(session_id: str, position: int, state_dir: Path = DEFAULT_STATE_DIR) -> None:
-    """Store the last-processed line number."""
+    """Store the last-processed byte offset."""
     sf = _state_file(session_id, state_dir)
-    sf.write_text(str(position))
+    sf.write_text(f"b{position}")
+
+
+# Resolved transcript paths per session, revalidated with a single exists()
+_transcript_cache: dict[str, Path] = {}
 
 
 def find_transcript_path(session_id: str) -> Path | None:
     """Find the JSONL transcript file for a Claude Code session."""
+    cached = _transcript_cache.get(session_id)
+    if cached is not None and cached.exists():
+        return cached
+
     # Claude Code stores transcripts in ~/.claude/projects/*/SESSION_ID.jsonl
     claude_dir = Path.home() / ".claude" / "projects"
     if not claude_dir.exists():
         return None
 
-    for project_dir in claude_dir.iterdir():
-        if project_dir.is_dir():
-            transcript = project_dir / f"{session_id}.jsonl"
-            if transcript.exists():
-                return transcript
+    # glob scans each project dir with a single scandir call instead of
+    # stat-ing a candidate path per directory
+    for transcript in claude_dir.glob(f"*/{session_id}.jsonl"):
+        _transcript_cache[session_id] = transcript
+        return transcript
     return None
 
 
@@ -69,42 +94,117 @@ async def capture_new_messages(
     if not path or not path.exists():
         return {"captured": 0, "error": "Transcript not found"}
 
-    last_pos = _get_last_position(session_id, state_dir)
-    new_messages = 0
-    final_pos = last_pos
-
-    with open(path) as f:
-        for line_num, line in enumerate(f):
-            if line_num < last_pos:
-                continue
-
-            line = line.strip()
+    last_pos, is_bytes = _get_last_position(session_id, state_dir)
+
+    # Accumulate (role, content, offset) triples and insert them in one
+    # executemany + commit — a per-line insert_message round-trip pays an
+    # event-loop cycle per line.
+    captured: list[tuple[str, str, int]] = []
+
+    with open(path, "rb") as f:
+        if not is_bytes:
+            # Legacy state stored a line number: one migration scan to find
+            # the corresponding byte offset, then byte offsets from here on.
+            for _ in range(last_pos):
+                if not f.readline():
+                    break
+            last_pos = f.tell()
+        elif last_pos:
+            f.seek(0, os.SEEK_END)
+            if last_pos > f.tell():
+                last_pos = 0  # Transcript was replaced/truncated — rescan
+            f.seek(last_pos)
+
+        final_pos = last_pos
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # Partial last line (writer mid-append) — pick it up next run
+
+            line_offset = final_pos
+            final_pos += len(raw)
+
+            line = raw.strip()
             if not line:
-                final_pos = line_num + 1
                 continue
 
             try:
-                entry = json.loads(line)
+                # orjson (when installed) parses the raw bytes directly,
+                # skipping the utf-8 decode stdlib json would need
+                entry = _json.loads(line)
             except json.JSONDecodeError:
-                final_pos = line_num + 1
                 continue
 
             # Extract message content based on Claude Code transcript format
             role, content = _extract_message(entry)
             if role and content:
-                await insert_message(
-                    db=db,
-                    session_id=session_id,
-                    role=role,
-                    content=content,
-                    metadata={"source": "transcript", "line": line_num},
-                )
-                new_messages += 1
-
-            final_pos = line_num + 1
+                captured.append((role, content, line_offset))
+
+    # Build insert tuples in one comprehension; the token heuristic
+    # (estimate_tokens, ~4 chars/token) is inlined to skip a Python
+    # function call per row on the bulk path.
+    rows = [
+        (
+            session_id,
+            role,
+            content,
+            max(1, len(content) // 4),
+            _json.dumps({"source": "transcript", "offset": offset}),
+        )
+        for role, content, offset in captured
+    ]
+    await insert_messages_bulk(db, rows)
 
     _set_last_position(session_id, final_pos, state_dir)
-    return {"captured": new_messages, "last_position": final_pos}
+    return {"captured": len(rows), "last_position": final_pos}
+
+
+def _extract_standard(entry: dict) -> tuple[str | None, str | None]:
+    """Standard message format, possibly with multi-part content."""
+    role = entry.get("role", "unknown")
+    content = entry.get("content", "")
+    if isinstance(content, list):
+        # Multi-part content (text + tool_use etc.)
+        parts = []
+        for part in content:
+            if isinstance(part, dict):
+                if part.get("type") == "text":
+                    parts.append(part.get("text", ""))
+                elif part.get("type") == "tool_use":
+                    parts.append(
+                        f"[Tool: {part.get('name', '?')}({_json.dumps(part.get('input', {}))[:200]})]"
+                    )
+                elif part.get("type") == "tool_result":
+                    result_content = part.get("content", "")
+                    if isinstance(result_content, str):
+                        parts.append(f"[ToolResult: {result_content[:500]}]")
+            elif isinstance(part, str):
+                parts.append(part)
+        content = "\n".join(parts)
+    return role, content if content else None
+
+
+def _extract_human(entry: dict) -> tuple[str | None, str | None]:
+    """User prompt format."""
+    return "user", entry.get("message", entry.get("content", ""))
+
+
+def _extract_assistant(entry: dict) -> tuple[str | None, str | None]:
+    """Assistant response format."""
+    return "assistant", entry.get("message", entry.get("content", ""))
+
+
+def _extract_tool_result(entry: dict) -> tuple[str | None, str | None]:
+    """Tool result format."""
+    return "tool", str(entry.get("content", ""))[:1000]
+
+
+# Dispatch on entry type — one hash lookup per line instead of a branch ladder
+_EXTRACTORS = {
+    "message": _extract_standard,
+    "human": _extract_human,
+    "assistant": _extract_assistant,
+    "tool_result": _extract_tool_result,
+}
 
 
 def _extract_message(entry: dict) -> tuple[str | None, str | None]:
@@ -112,40 +212,5 @@ def _extract_message(entry: dict) -> tuple[str | None, str | None]:
 
     Claude Code transcript entries have varying formats. We handle the common ones.
     """
-    # Standard message format
-    if "type" in entry and entry["type"] == "message":
-        role = entry.get("role", "unknown")
-        content = entry.get("content", "")
-        if isinstance(content, list):
-            # Multi-part content (text + tool_use etc.)
-            parts = []
-            for part in content:
-                if isinstance(part, dict):
-                    if part.get("type") == "text":
-                        parts.append(part.get("text", ""))
-                    elif part.get("type") == "tool_use":
-                        parts.append(
-                            f"[Tool: {part.get('name', '?')}({json.dumps(part.get('input', {}))[:200]})]"
-                        )
-                    elif part.get("type") == "tool_result":
-                        result_content = part.get("content", "")
-                        if isinstance(result_content, str):
-                            parts.append(f"[ToolResult: {result_content[:500]}]")
-                elif isinstance(part, str):
-                    parts.append(part)
-            content = "\n".join(parts)
-        return role, content if content else None
-
-    # User prompt format
-    if "type" in entry and entry["type"] == "human":
-        return "user", entry.get("message", entry.get("content", ""))
-
-    # Assistant response format
-    if "type" in entry and entry["type"] == "assistant":
-        return "assistant", entry.get("message", entry.get("content", ""))
-
-    # Tool result format
-    if "type" in entry and entry["type"] == "tool_result":
-        return "tool", str(entry.get("content", ""))[:1000]
-
-    return None, None
+    handler = _EXTRACTORS.get(entry.get("type"))
+    return handler(entry) if handler else (None, None)
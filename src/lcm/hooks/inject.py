@@ -6,6 +6,24 @@ import aiosqlite
 
 from lcm.store.summaries import get_top_level_summaries
 
+# Rendered injection text per (session_id, summaries version, max_tokens).
+# Summaries are append-only, so MAX(id) is a valid version stamp: the
+# top-level set only changes when a new summary row appears.
+_CACHE_MAX_ENTRIES = 64
+_inject_cache: dict[tuple[str, int, int], str] = {}
+
+# Static preamble, rendered once at import time
+_INJECT_HEADER = "\n".join(
+    [
+        "# LCM Context Recovery",
+        "",
+        "The following summaries cover your conversation history. "
+        "Use `lcm_expand(summary_id)` to retrieve full messages, "
+        "or `lcm_grep(pattern)` to search across all history.",
+        "",
+    ]
+)
+
 
 async def build_injection_text(
     db: aiosqlite.Connection,
@@ -17,25 +35,30 @@ async def build_injection_text(
     Formats top-level DAG nodes as a concise context block with LCM IDs
     that the assistant can use with lcm_expand to drill into details.
     """
+    cursor = await db.execute(
+        "SELECT COALESCE(MAX(id), 0) FROM summaries WHERE session_id = ?",
+        (session_id,),
+    )
+    (version,) = await cursor.fetchone()
+
+    cache_key = (session_id, version, max_tokens)
+    cached = _inject_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     summaries = await get_top_level_summaries(db, session_id)
 
     if not summaries:
         return ""
 
-    parts = [
-        "# LCM Context Recovery",
-        "",
-        "The following summaries cover your conversation history. "
-        "Use `lcm_expand(summary_id)` to retrieve full messages, "
-        "or `lcm_grep(pattern)` to search across all history.",
-        "",
-    ]
+    parts = [_INJECT_HEADER]
 
     total_tokens = 0
-    for s in summaries:
+    for idx, s in enumerate(summaries):
         if total_tokens + s.token_estimate > max_tokens:
+            remaining = len(summaries) - idx
             parts.append(
-                f"\n[{len(summaries) - len(parts) + 4} more summaries available — use lcm_status()]"
+                f"\n[{remaining} more summaries available — use lcm_status()]"
             )
             break
 
@@ -45,4 +68,8 @@ async def build_injection_text(
         parts.append("")
         total_tokens += s.token_estimate
 
-    return "\n".join(parts)
+    text = "\n".join(parts)
+    if len(_inject_cache) >= _CACHE_MAX_ENTRIES:
+        _inject_cache.clear()
+    _inject_cache[cache_key] = text
+    return text
@@ -0,0 +1,69 @@
+"""SQLite-backed cache of LLM responses keyed by input hash.
+
+Retries, dev iterations, and rows repeated across JSONL files re-issue
+byte-identical requests; a hit here skips the API call entirely. The
+cache lives in its own database file (default ~/.lcm/llm_cache.db,
+override with LCM_LLM_CACHE_PATH) rather than the message store, so the
+llm layer stays independent of the store's connection and migrations.
+Lookups use the synchronous sqlite3 module — they are sub-millisecond
+point reads, far below the latency of the API call they replace.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path.home() / ".lcm" / "llm_cache.db"
+
+_conn: sqlite3.Connection | None = None
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        path = Path(os.environ.get("LCM_LLM_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(str(path))
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                ts TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+            )
+            """
+        )
+        _conn.commit()
+    return _conn
+
+
+def cache_key(*parts: str) -> str:
+    """Hash the request-defining parts (model, system, user content, ...)."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Return the cached raw response text, or None on miss."""
+    cursor = _get_conn().execute(
+        "SELECT response FROM llm_cache WHERE key = ?", (key,)
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def put(key: str, response: str) -> None:
+    """Store a raw response text under its key."""
+    conn = _get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO llm_cache (key, response) VALUES (?, ?)",
+        (key, response),
+    )
+    conn.commit()
@@ -2,16 +2,38 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 from typing import Any
 
 import anthropic
 
+from lcm import _json
+from lcm.llm import cache
+from lcm.llm.ratelimit import get_bucket
+
 DEFAULT_MODEL = "claude-haiku-4-5-20251001"
 
 
+def _request_token_estimate(text: str, max_tokens: int) -> int:
+    """Rough in+out token cost of a request, for the rate limiter."""
+    return max(1, len(text) // 4) + max_tokens
+
+
+def _cacheable_system(text: str) -> list[dict]:
+    """System prompt as a cache_control block.
+
+    The system text is identical across the thousands of calls an llm_map
+    run issues; marking it ephemeral lets the API serve the prefix from its
+    prompt cache instead of re-reading those tokens every request.
+    """
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+@functools.lru_cache(maxsize=1)
 def _get_client() -> anthropic.AsyncAnthropic:
+    """Shared client — reuses the underlying httpx connection pool across calls."""
     return anthropic.AsyncAnthropic()
 
 
@@ -42,10 +64,11 @@ async def summarize(
     system = system_prompts.get(mode, system_prompts["preserve_details"])
 
     client = _get_client()
+    await get_bucket().acquire(_request_token_estimate(system + content, target_tokens * 2))
     response = await client.messages.create(
         model=model,
         max_tokens=target_tokens * 2,  # Allow some headroom
-        system=system,
+        system=_cacheable_system(system),
         messages=[{"role": "user", "content": content}],
     )
     return response.content[0].text
@@ -63,15 +86,22 @@ async def classify(
     """
     system = "You are a data processing assistant. Respond only with valid JSON."
     if output_schema:
-        system += f"\n\nOutput must conform to this JSON schema:\n{json.dumps(output_schema)}"
+        system += f"\n\nOutput must conform to this JSON schema:\n{_json.dumps(output_schema)}"
+
+    user_content = f"{prompt}\n\nInput:\n{_json.dumps(item)}"
 
-    user_content = f"{prompt}\n\nInput:\n{json.dumps(item)}"
+    # The schema is folded into system, so the key covers it too
+    key = cache.cache_key(model, system, user_content)
+    cached = cache.get(key)
+    if cached is not None:
+        return _json.loads(cached)
 
     client = _get_client()
+    await get_bucket().acquire(_request_token_estimate(system + user_content, 2048))
     response = await client.messages.create(
         model=model,
         max_tokens=2048,
-        system=system,
+        system=_cacheable_system(system),
         messages=[{"role": "user", "content": user_content}],
     )
 
@@ -80,7 +110,56 @@ async def classify(
     if text.startswith("```"):
         lines = text.split("\n")
         text = "\n".join(lines[1:-1]) if len(lines) > 2 else text
-    return json.loads(text)
+    result = _json.loads(text)
+    cache.put(key, text)
+    return result
+
+
+async def classify_batch(
+    items: list[Any],
+    prompt: str,
+    output_schema: dict | None = None,
+    model: str = DEFAULT_MODEL,
+) -> list[dict | None]:
+    """Classify several items with one API call (used by llm_map batching).
+
+    Sends the items as a numbered array and parses back outputs by index.
+    Returns one entry per input item in input order; entries the model
+    failed to produce are None so callers can retry them individually.
+    """
+    system = (
+        "You are a data processing assistant. Respond only with valid JSON of the form "
+        '{"results": [{"index": <input index>, "output": <result>}, ...]} '
+        "with exactly one entry per input item."
+    )
+    if output_schema:
+        system += f"\n\nEach output must conform to this JSON schema:\n{_json.dumps(output_schema)}"
+
+    numbered = [{"index": i, "item": item} for i, item in enumerate(items)]
+    user_content = f"{prompt}\n\nInput items:\n{_json.dumps(numbered)}"
+    max_tokens = min(8192, 1024 * len(items))
+
+    client = _get_client()
+    await get_bucket().acquire(_request_token_estimate(system + user_content, max_tokens))
+    response = await client.messages.create(
+        model=model,
+        max_tokens=max_tokens,
+        system=_cacheable_system(system),
+        messages=[{"role": "user", "content": user_content}],
+    )
+
+    text = response.content[0].text.strip()
+    if text.startswith("```"):
+        lines = text.split("\n")
+        text = "\n".join(lines[1:-1]) if len(lines) > 2 else text
+    data = _json.loads(text)
+
+    outputs: list[dict | None] = [None] * len(items)
+    for entry in data.get("results", []):
+        index = entry.get("index") if isinstance(entry, dict) else None
+        if isinstance(index, int) and 0 <= index < len(items):
+            outputs[index] = entry.get("output")
+    return outputs
 
 
 async def agent_loop(
@@ -99,7 +178,7 @@ async def agent_loop(
     """
     system = "You are a data processing agent. Process the given item using available tools."
     if output_schema:
-        system += f"\n\nFinal output must conform to this JSON schema:\n{json.dumps(output_schema)}"
+        system += f"\n\nFinal output must conform to this JSON schema:\n{_json.dumps(output_schema)}"
     if read_only:
         system += "\n\nYou are in read-only mode. Do not modify any files."
 
@@ -138,7 +217,12 @@ async def agent_loop(
             )
 
     api_tools = tools or default_tools
-    user_content = f"{prompt}\n\nInput:\n{json.dumps(item)}"
+    if api_tools:
+        # Mark the last tool block cacheable so the (static) tool definitions
+        # join the cached prefix alongside the system prompt
+        api_tools = [dict(t) for t in api_tools]
+        api_tools[-1]["cache_control"] = {"type": "ephemeral"}
+    user_content = f"{prompt}\n\nInput:\n{_json.dumps(item)}"
 
     messages = [{"role": "user", "content": user_content}]
     client = _get_client()
@@ -147,12 +231,13 @@ async def agent_loop(
         kwargs: dict[str, Any] = {
             "model": model,
             "max_tokens": 4096,
-            "system": system,
+            "system": _cacheable_system(system),
             "messages": messages,
         }
         if api_tools:
             kwargs["tools"] = api_tools
 
+        await get_bucket().acquire(_request_token_estimate(system + user_content, 4096))
         response = await client.messages.create(**kwargs)
 
         # Check if we have a final text response (no tool use)
@@ -165,7 +250,7 @@ async def agent_loop(
                         lines = text.split("\n")
                         text = "\n".join(lines[1:-1]) if len(lines) > 2 else text
                     try:
-                        return json.loads(text)
+                        return _json.loads(text)
                     except json.JSONDecodeError:
                         return {"result": text}
             return {"result": "No output"}
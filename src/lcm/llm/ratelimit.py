@@ -0,0 +1,88 @@
+"""Proactive rate limiting for Anthropic API calls.
+
+Blind semaphore throttling floods the API until it answers 429 and then
+stalls on backoff. A token bucket smooths issuance to just under the
+account's requests/min and tokens/min ceilings instead, so fan-out
+operators run at a steady rate without retry storms.
+
+Limits come from the LCM_RPM and LCM_TPM environment variables; leaving
+either unset (or 0) disables that dimension.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+
+class AsyncTokenBucket:
+    """Dual token bucket over requests/min and tokens/min.
+
+    acquire(tokens) blocks until one request slot and the given token
+    credit are both available. Capacity refills continuously from elapsed
+    wall time. A limit of 0 means that dimension is unlimited.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until capacity for one request (and `tokens` tokens) is free."""
+        if not self.rpm and not self.tpm:
+            return
+
+        # An estimate above the bucket's capacity could never be satisfied
+        # (_refill caps at tpm) and would spin here forever; clamp it so an
+        # oversized request drains the full bucket and proceeds instead
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+
+        while True:
+            async with self._lock:
+                self._refill()
+                request_ok = not self.rpm or self._requests >= 1
+                tokens_ok = not self.tpm or self._tokens >= tokens
+                if request_ok and tokens_ok:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= tokens
+                    return
+
+                wait = 0.01
+                if self.rpm and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+            await asyncio.sleep(wait)
+
+
+_bucket: AsyncTokenBucket | None = None
+
+
+def get_bucket() -> AsyncTokenBucket:
+    """Shared process-wide bucket, configured from LCM_RPM / LCM_TPM."""
+    global _bucket
+    if _bucket is None:
+        try:
+            rpm = int(os.environ.get("LCM_RPM", "0"))
+            tpm = int(os.environ.get("LCM_TPM", "0"))
+        except ValueError:
+            rpm = tpm = 0
+        _bucket = AsyncTokenBucket(rpm=rpm, tpm=tpm)
+    return _bucket
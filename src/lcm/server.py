@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-import json
+import functools
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -14,18 +14,32 @@ from mcp.server.fastmcp import FastMCP
 # Load .env from the project root (next to pyproject.toml)
 load_dotenv(Path(__file__).resolve().parents[2] / ".env")
 
-from lcm.store.database import get_db
+from lcm import _json
+from lcm.store.pool import ConnectionPool
 
-# Global database connection
-_db: aiosqlite.Connection | None = None
+# Writer + read-only pool; read tools take readers so concurrent calls
+# don't queue behind one aiosqlite worker thread
+_pool: ConnectionPool | None = None
 
 
-async def _get_db() -> aiosqlite.Connection:
-    global _db
-    if _db is None:
-        db_path = os.environ.get("LCM_DB_PATH")
-        _db = await get_db(db_path)
-    return _db
+async def _get_db(readonly: bool = False) -> aiosqlite.Connection:
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(os.environ.get("LCM_DB_PATH"))
+    return await (_pool.reader() if readonly else _pool.writer())
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_schema(schema_str: str) -> dict | None:
+    """Parse an output_schema argument once per distinct string.
+
+    Driver loops pass the same schema on every call; caching also keeps
+    the parsed dict (and hence its serialized form in the system prompt)
+    stable, which the API prompt cache depends on.
+    """
+    if schema_str in ("", "{}"):
+        return None
+    return _json.loads(schema_str)
 
 
 mcp = FastMCP(
@@ -46,9 +60,9 @@ async def lcm_status(session_id: str = "default") -> str:
     """
     from lcm.tools.status import lcm_status as _status
 
-    db = await _get_db()
+    db = await _get_db(readonly=True)
     result = await _status(db, session_id)
-    return json.dumps(result, indent=2)
+    return _json.dumps_pretty(result)
 
 
 @mcp.tool()
@@ -72,12 +86,12 @@ async def lcm_grep(
     """
     from lcm.tools.memory import lcm_grep as _grep
 
-    db = await _get_db()
+    db = await _get_db(readonly=True)
     result = await _grep(
         db, pattern, session_id=session_id, summary_id=summary_id,
         page=page, use_regex=use_regex,
     )
-    return json.dumps(result, indent=2)
+    return _json.dumps_pretty(result)
 
 
 @mcp.tool()
@@ -91,9 +105,9 @@ async def lcm_describe(lcm_id: str) -> str:
     """
     from lcm.tools.memory import lcm_describe as _describe
 
-    db = await _get_db()
+    db = await _get_db(readonly=True)
     result = await _describe(db, lcm_id)
-    return json.dumps(result, indent=2)
+    return _json.dumps_pretty(result)
 
 
 @mcp.tool()
@@ -108,9 +122,9 @@ async def lcm_expand(summary_id: int, page: int = 1) -> str:
     """
     from lcm.tools.memory import lcm_expand as _expand
 
-    db = await _get_db()
+    db = await _get_db(readonly=True)
     result = await _expand(db, summary_id, page=page)
-    return json.dumps(result, indent=2)
+    return _json.dumps_pretty(result)
 
 
 @mcp.tool()
@@ -119,6 +133,7 @@ async def llm_map(
     prompt: str,
     output_schema: str = "{}",
     concurrency: int = 16,
+    batch_size: int = 1,
 ) -> str:
     """Process each line of a JSONL file with a stateless LLM call (Haiku).
 
@@ -129,17 +144,19 @@ async def llm_map(
         prompt: Instructions for processing each item
         output_schema: JSON schema string for output validation (default: "{}" for no validation)
         concurrency: Max concurrent API calls (default: 16)
+        batch_size: Items to share one API call — raise when requests/min-bound (default: 1)
     """
     from lcm.tools.operators import llm_map as _llm_map
 
-    schema = json.loads(output_schema) if output_schema != "{}" else None
+    schema = _parse_schema(output_schema)
     result = await _llm_map(
         input_path=input_path,
         prompt=prompt,
         output_schema=schema,
         concurrency=concurrency,
+        batch_size=batch_size,
     )
-    return json.dumps(result, indent=2)
+    return _json.dumps_pretty(result)
 
 
 @mcp.tool()
@@ -163,7 +180,7 @@ async def agentic_map(
     """
     from lcm.tools.operators import agentic_map as _agentic_map
 
-    schema = json.loads(output_schema) if output_schema != "{}" else None
+    schema = _parse_schema(output_schema)
     result = await _agentic_map(
         input_path=input_path,
         prompt=prompt,
@@ -171,7 +188,7 @@ async def agentic_map(
         read_only=read_only,
         concurrency=concurrency,
     )
-    return json.dumps(result, indent=2)
+    return _json.dumps_pretty(result)
 
 
 def main() -> None:
@@ -2,15 +2,27 @@
 
 from __future__ import annotations
 
+import functools
 import os
+import re
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import aiosqlite
 
+try:
+    # Optional linear-time regex engine (lcm[speed]); immune to
+    # catastrophic backtracking on adversarial patterns. google-re2
+    # raises on syntax outside RE2 (backreferences, lookarounds), so
+    # _compile falls back to stdlib re for those patterns.
+    import re2 as _re_backend
+except ImportError:
+    _re_backend = re
+
 DEFAULT_DB_DIR = Path.home() / ".lcm"
 DEFAULT_DB_PATH = DEFAULT_DB_DIR / "lcm.db"
 
-SCHEMA_VERSION = 1
+SCHEMA_VERSION = 6
 
 MIGRATIONS: dict[int, list[str]] = {
     1: [
@@ -95,25 +107,197 @@ MIGRATIONS: dict[int, list[str]] = {
         "CREATE INDEX IF NOT EXISTS idx_summaries_msg_range ON summaries(msg_start_id, msg_end_id)",
         "CREATE INDEX IF NOT EXISTS idx_large_files_session ON large_files(session_id)",
     ],
+    2: [
+        # Rebuild the FTS index with session_id as an UNINDEXED column so
+        # session-filtered searches apply the filter during the FTS scan,
+        # before ranking, instead of probing messages for every hit
+        "DROP TRIGGER IF EXISTS messages_ai",
+        "DROP TRIGGER IF EXISTS messages_ad",
+        "DROP TABLE IF EXISTS messages_fts",
+        """
+        CREATE VIRTUAL TABLE messages_fts USING fts5(
+            content,
+            session_id UNINDEXED,
+            content='messages',
+            content_rowid='id',
+            tokenize='porter unicode61'
+        )
+        """,
+        "INSERT INTO messages_fts(messages_fts) VALUES('rebuild')",
+        """
+        CREATE TRIGGER messages_ai AFTER INSERT ON messages BEGIN
+            INSERT INTO messages_fts(rowid, content, session_id)
+            VALUES (new.id, new.content, new.session_id);
+        END
+        """,
+        """
+        CREATE TRIGGER messages_ad AFTER DELETE ON messages BEGIN
+            INSERT INTO messages_fts(messages_fts, rowid, content, session_id)
+            VALUES('delete', old.id, old.content, old.session_id);
+        END
+        """,
+        "INSERT OR IGNORE INTO schema_version (version) VALUES (2)",
+    ],
+    3: [
+        # Composite indexes: (session_id, id) keeps session scans in id
+        # order without per-hit rowid lookups, and the summaries range
+        # index lets coverage checks seek instead of scanning the session
+        "CREATE INDEX IF NOT EXISTS idx_messages_session_id ON messages(session_id, id)",
+        """
+        CREATE INDEX IF NOT EXISTS idx_summaries_session_range
+        ON summaries(session_id, msg_start_id, msg_end_id)
+        """,
+        "INSERT OR IGNORE INTO schema_version (version) VALUES (3)",
+    ],
+    4: [
+        # The "not a child of anything" anti-joins probe links by child_id;
+        # the table's primary key leads with parent_id, so give child_id
+        # its own index
+        "CREATE INDEX IF NOT EXISTS idx_summary_links_child ON summary_links(child_id)",
+        "INSERT OR IGNORE INTO schema_version (version) VALUES (4)",
+    ],
+    5: [
+        # Covering-summary lookups seek on the range and want the highest
+        # level first; carrying level DESC in the index resolves the
+        # ORDER BY ... LIMIT 1 without sorting the candidate rows
+        """
+        CREATE INDEX IF NOT EXISTS idx_summaries_range_level
+        ON summaries(msg_start_id, msg_end_id, level DESC)
+        """,
+        "INSERT OR IGNORE INTO schema_version (version) VALUES (5)",
+    ],
+    6: [
+        # FTS index over file paths: unicode61 treats /, ., _ and - as
+        # separators, so each path segment is its own token and a search
+        # like "auth" seeks the index instead of LIKE-scanning every row
+        """
+        CREATE VIRTUAL TABLE files_fts USING fts5(
+            file_path,
+            session_id UNINDEXED,
+            content='large_files',
+            content_rowid='id',
+            tokenize='unicode61'
+        )
+        """,
+        "INSERT INTO files_fts(files_fts) VALUES('rebuild')",
+        """
+        CREATE TRIGGER large_files_ai AFTER INSERT ON large_files BEGIN
+            INSERT INTO files_fts(rowid, file_path, session_id)
+            VALUES (new.id, new.file_path, new.session_id);
+        END
+        """,
+        """
+        CREATE TRIGGER large_files_ad AFTER DELETE ON large_files BEGIN
+            INSERT INTO files_fts(files_fts, rowid, file_path, session_id)
+            VALUES('delete', old.id, old.file_path, old.session_id);
+        END
+        """,
+        "INSERT OR IGNORE INTO schema_version (version) VALUES (6)",
+    ],
 }
 
 
+@functools.lru_cache(maxsize=256)
+def _compile(pattern: str, flags: int) -> re.Pattern:
+    """Compile a regex once per (pattern, flags) — the UDF runs per row."""
+    if _re_backend is not re:
+        try:
+            return _re_backend.compile(pattern, flags)
+        except _re_backend.error:
+            # Pattern uses syntax RE2 rejects (e.g. a backreference);
+            # compile it with stdlib re so it keeps working under the
+            # speed extra, just without the linear-time guarantee
+            pass
+    return re.compile(pattern, flags)
+
+
+def _regexp(pattern: str, content: str | None) -> int:
+    """REGEXP implementation for SQLite (case-insensitive, like lcm_grep)."""
+    return 1 if _compile(pattern, re.IGNORECASE).search(content or "") else 0
+
+
 async def get_db(db_path: str | Path | None = None) -> aiosqlite.Connection:
     """Open a database connection with WAL mode and run migrations."""
     path = Path(db_path) if db_path else DEFAULT_DB_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    db = await aiosqlite.connect(str(path))
+    # iter_chunk_size batches rows per event-loop/worker-thread hop when
+    # cursors are iterated with async for (default is 64);
+    # cached_statements keeps the hot helpers' SQL compiled across calls
+    db = await aiosqlite.connect(
+        str(path), iter_chunk_size=1024, cached_statements=256
+    )
     db.row_factory = aiosqlite.Row
 
-    # Enable WAL mode and foreign keys
+    # Enable WAL mode and foreign keys. NORMAL sync is durable enough
+    # under WAL (fsync on checkpoint, not per commit) and much faster
+    # on commit-heavy paths like message ingest.
     await db.execute("PRAGMA journal_mode=WAL")
+    await db.execute("PRAGMA synchronous=NORMAL")
     await db.execute("PRAGMA foreign_keys=ON")
+    # Keep sort/temp b-trees off disk, mmap reads (256MB window) to skip
+    # read() syscalls on large scans, and give the page cache 64MB so the
+    # FTS b-trees stay hot; checkpoint the WAL every ~1000 pages.
+    await db.execute("PRAGMA temp_store=MEMORY")
+    await db.execute("PRAGMA mmap_size=268435456")
+    await db.execute("PRAGMA cache_size=-65536")
+    await db.execute("PRAGMA wal_autocheckpoint=1000")
+
+    # REGEXP UDF so regex search can filter inside SQLite instead of
+    # marshalling every row into Python (see search_messages_regex)
+    await db.create_function("REGEXP", 2, _regexp, deterministic=True)
 
     await _run_migrations(db)
     return db
 
 
+async def get_readonly_db(db_path: str | Path | None = None) -> aiosqlite.Connection:
+    """Open a read-only connection to an existing database.
+
+    Under WAL, readers never block each other or the writer, so a pool
+    of these lets concurrent read tools run in parallel instead of
+    queueing behind one connection's worker thread. The database must
+    already exist (open the writer via get_db first).
+    """
+    path = Path(db_path) if db_path else DEFAULT_DB_PATH
+
+    db = await aiosqlite.connect(
+        f"file:{path}?mode=ro", uri=True, iter_chunk_size=1024, cached_statements=256
+    )
+    db.row_factory = aiosqlite.Row
+
+    await db.execute("PRAGMA query_only=1")
+    # Same read-side tuning as the writer — scans mostly run here
+    await db.execute("PRAGMA temp_store=MEMORY")
+    await db.execute("PRAGMA mmap_size=268435456")
+    await db.execute("PRAGMA cache_size=-65536")
+    await db.create_function("REGEXP", 2, _regexp, deterministic=True)
+    return db
+
+
+@asynccontextmanager
+async def transaction(db: aiosqlite.Connection, immediate: bool = False):
+    """Group several writes under one commit (one WAL fsync for the batch).
+
+    Use with the commit=False variants of the insert helpers:
+
+        async with transaction(db):
+            for ... :
+                await insert_message(db, ..., commit=False)
+
+    immediate=True takes the write lock up front (BEGIN IMMEDIATE), so a
+    multi-statement write can't hit SQLITE_BUSY midway through.
+    """
+    await db.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield
+    except BaseException:
+        await db.rollback()
+        raise
+    else:
+        await db.commit()
+
+
 async def _get_current_version(db: aiosqlite.Connection) -> int:
     """Get the current schema version, or 0 if no schema exists."""
     try:
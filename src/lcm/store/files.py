@@ -71,7 +71,10 @@ async def get_files_by_session(
         "SELECT * FROM large_files WHERE session_id = ? ORDER BY id",
         (session_id,),
     )
-    return [FileRef.from_row(row) for row in await cursor.fetchall()]
+    results: list[FileRef] = []
+    async for row in cursor:
+        results.append(FileRef.from_row(row))
+    return results
 
 
 async def search_files_by_path(
@@ -79,7 +82,40 @@ async def search_files_by_path(
     pattern: str,
     session_id: str | None = None,
 ) -> list[FileRef]:
-    """Search file references by path pattern (SQL LIKE)."""
+    """Search file references by path pattern.
+
+    Runs against the files_fts index, where each path segment is a
+    token: the pattern matches whole segments and segment prefixes
+    ("auth" finds /src/auth/login.py and /src/authentication.py) via an
+    index seek instead of a LIKE scan over every row. Patterns FTS5
+    cannot parse fall back to the old LIKE substring scan.
+    """
+    match = '"' + pattern.replace('"', '""') + '"*'
+    try:
+        if session_id:
+            cursor = await db.execute(
+                """
+                SELECT f.* FROM large_files f
+                JOIN files_fts ON f.id = files_fts.rowid
+                WHERE files_fts MATCH ? AND files_fts.session_id = ?
+                ORDER BY f.id
+                """,
+                (match, session_id),
+            )
+        else:
+            cursor = await db.execute(
+                """
+                SELECT f.* FROM large_files f
+                JOIN files_fts ON f.id = files_fts.rowid
+                WHERE files_fts MATCH ?
+                ORDER BY f.id
+                """,
+                (match,),
+            )
+        return [FileRef.from_row(row) for row in await cursor.fetchall()]
+    except aiosqlite.OperationalError:
+        pass
+
     if session_id:
         cursor = await db.execute(
             "SELECT * FROM large_files WHERE file_path LIKE ? AND session_id = ? ORDER BY id",
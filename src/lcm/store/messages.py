@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
-import json
 import re
 from dataclasses import dataclass, field
 
 import aiosqlite
 
+from lcm import _json
+from lcm.store.database import _compile
+
+
+def _parse_metadata(raw: str | None) -> dict:
+    """Decode a metadata column; most rows hold '{}', which needs no parse."""
+    if not raw or raw == "{}":
+        return {}
+    return _json.loads(raw)
+
 
 @dataclass
 class Message:
@@ -28,7 +37,8 @@ class Message:
             content=row["content"],
             token_estimate=row["token_estimate"],
             timestamp=row["timestamp"],
-            metadata=json.loads(row["metadata"]) if row["metadata"] else {},
+            # metadata is almost always '{}' — skip the parse on that path
+            metadata=_parse_metadata(row["metadata"]),
         )
 
 
@@ -43,10 +53,15 @@ async def insert_message(
     role: str,
     content: str,
     metadata: dict | None = None,
+    commit: bool = True,
 ) -> int:
-    """Insert a message (append-only). Returns the new message ID."""
+    """Insert a message (append-only). Returns the new message ID.
+
+    Pass commit=False inside a database.transaction() block to amortize
+    the commit across a batch while still getting per-row IDs back.
+    """
     token_est = estimate_tokens(content)
-    meta_json = json.dumps(metadata or {})
+    meta_json = _json.dumps(metadata or {})
 
     cursor = await db.execute(
         """
@@ -55,10 +70,34 @@ async def insert_message(
         """,
         (session_id, role, content, token_est, meta_json),
     )
-    await db.commit()
+    if commit:
+        await db.commit()
     return cursor.lastrowid
 
 
+async def insert_messages_bulk(
+    db: aiosqlite.Connection,
+    rows: list[tuple[str, str, str, int, str]],
+) -> int:
+    """Insert many messages in one transaction. Returns the row count.
+
+    Rows are (session_id, role, content, token_estimate, metadata_json)
+    tuples. One executemany + commit amortizes the WAL fsync across the
+    batch instead of paying it per message as insert_message does.
+    """
+    if not rows:
+        return 0
+    await db.executemany(
+        """
+        INSERT INTO messages (session_id, role, content, token_estimate, metadata)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    await db.commit()
+    return len(rows)
+
+
 async def get_message(db: aiosqlite.Connection, message_id: int) -> Message | None:
     """Get a single message by ID."""
     cursor = await db.execute("SELECT * FROM messages WHERE id = ?", (message_id,))
@@ -70,13 +109,37 @@ async def get_messages_by_range(
     db: aiosqlite.Connection,
     start_id: int,
     end_id: int,
+    limit: int | None = None,
+    offset: int = 0,
 ) -> list[Message]:
-    """Get messages in an ID range (inclusive)."""
-    cursor = await db.execute(
-        "SELECT * FROM messages WHERE id >= ? AND id <= ? ORDER BY id",
-        (start_id, end_id),
-    )
-    return [Message.from_row(row) for row in await cursor.fetchall()]
+    """Get messages in an ID range (inclusive), optionally paginated."""
+    sql = """
+        SELECT id, session_id, role, content, token_estimate, timestamp, metadata
+        FROM messages WHERE id >= ? AND id <= ? ORDER BY id
+        """
+    params: tuple = (start_id, end_id)
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params += (limit, offset)
+    cursor = await db.execute(sql, params)
+    # Stream rows as plain tuples: this can return tens of thousands of
+    # rows, and positional unpack skips the 7 keyed Row lookups per row
+    # that Message.from_row pays
+    cursor.row_factory = None
+    results: list[Message] = []
+    async for id_, sid, role, content, tok, ts, meta in cursor:
+        results.append(
+            Message(
+                id=id_,
+                session_id=sid,
+                role=role,
+                content=content,
+                token_estimate=tok,
+                timestamp=ts,
+                metadata=_parse_metadata(meta),
+            )
+        )
+    return results
 
 
 async def get_messages_by_session(
@@ -90,7 +153,10 @@ async def get_messages_by_session(
         "SELECT * FROM messages WHERE session_id = ? ORDER BY id LIMIT ? OFFSET ?",
         (session_id, limit, offset),
     )
-    return [Message.from_row(row) for row in await cursor.fetchall()]
+    results: list[Message] = []
+    async for row in cursor:
+        results.append(Message.from_row(row))
+    return results
 
 
 async def search_messages_fts(
@@ -100,15 +166,22 @@ async def search_messages_fts(
     limit: int = 10,
     offset: int = 0,
 ) -> list[Message]:
-    """Search messages using FTS5. Query uses FTS5 syntax (AND, OR, NOT, phrases)."""
+    """Search messages using FTS5. Query uses FTS5 syntax (AND, OR, NOT, phrases).
+
+    Ranking, the session filter (via the UNINDEXED session_id column),
+    and LIMIT/OFFSET all run inside the FTS scan; only the surviving
+    top-K rowids probe the messages table.
+    """
     if session_id:
         cursor = await db.execute(
             """
             SELECT m.* FROM messages m
-            JOIN messages_fts f ON m.id = f.rowid
-            WHERE messages_fts MATCH ? AND m.session_id = ?
-            ORDER BY rank
-            LIMIT ? OFFSET ?
+            JOIN (
+                SELECT rowid, rank FROM messages_fts
+                WHERE messages_fts MATCH ? AND session_id = ?
+                ORDER BY rank LIMIT ? OFFSET ?
+            ) f ON m.id = f.rowid
+            ORDER BY f.rank
             """,
             (query, session_id, limit, offset),
         )
@@ -116,14 +189,19 @@ async def search_messages_fts(
         cursor = await db.execute(
             """
             SELECT m.* FROM messages m
-            JOIN messages_fts f ON m.id = f.rowid
-            WHERE messages_fts MATCH ?
-            ORDER BY rank
-            LIMIT ? OFFSET ?
+            JOIN (
+                SELECT rowid, rank FROM messages_fts
+                WHERE messages_fts MATCH ?
+                ORDER BY rank LIMIT ? OFFSET ?
+            ) f ON m.id = f.rowid
+            ORDER BY f.rank
             """,
             (query, limit, offset),
         )
-    return [Message.from_row(row) for row in await cursor.fetchall()]
+    results: list[Message] = []
+    async for row in cursor:
+        results.append(Message.from_row(row))
+    return results
 
 
 async def search_messages_regex(
@@ -133,29 +211,82 @@ async def search_messages_regex(
     limit: int = 10,
     offset: int = 0,
 ) -> list[Message]:
-    """Search messages using Python regex on content."""
-    compiled = re.compile(pattern, re.IGNORECASE)
+    """Search messages using regex on content (case-insensitive).
+
+    The match runs inside SQLite via the REGEXP function registered in
+    get_db, so non-matching rows are filtered before they cross the
+    aiosqlite boundary and LIMIT/OFFSET applies in the engine.
+    """
+    _compile(pattern, re.IGNORECASE)  # Surface bad patterns here, not inside the UDF
 
     if session_id:
         cursor = await db.execute(
-            "SELECT * FROM messages WHERE session_id = ? ORDER BY id",
-            (session_id,),
+            """
+            SELECT * FROM messages
+            WHERE session_id = ? AND content REGEXP ?
+            ORDER BY id LIMIT ? OFFSET ?
+            """,
+            (session_id, pattern, limit, offset),
         )
     else:
-        cursor = await db.execute("SELECT * FROM messages ORDER BY id")
+        cursor = await db.execute(
+            "SELECT * FROM messages WHERE content REGEXP ? ORDER BY id LIMIT ? OFFSET ?",
+            (pattern, limit, offset),
+        )
+    return [Message.from_row(row) for row in await cursor.fetchall()]
 
-    results: list[Message] = []
-    skipped = 0
-    async for row in cursor:
-        if compiled.search(row["content"]):
-            if skipped < offset:
-                skipped += 1
-                continue
-            results.append(Message.from_row(row))
-            if len(results) >= limit:
-                break
 
-    return results
+async def count_messages_in_range(
+    db: aiosqlite.Connection, start_id: int, end_id: int
+) -> int:
+    """Count messages in an ID range (inclusive)."""
+    cursor = await db.execute(
+        "SELECT COUNT(*) FROM messages WHERE id >= ? AND id <= ?",
+        (start_id, end_id),
+    )
+    row = await cursor.fetchone()
+    return row[0]
+
+
+async def search_messages_in_range(
+    db: aiosqlite.Connection,
+    pattern: str,
+    start_id: int,
+    end_id: int,
+    use_regex: bool = False,
+    limit: int = 10,
+    offset: int = 0,
+) -> list[Message]:
+    """Search within a message ID range (used for summary-scoped grep).
+
+    The filter and pagination run in SQL — substring matches via LIKE
+    (case-insensitive, pattern metacharacters escaped), regex via the
+    REGEXP UDF — so only the requested page crosses the aiosqlite
+    boundary instead of every message the range covers.
+    """
+    if use_regex:
+        _compile(pattern, re.IGNORECASE)  # Surface bad patterns at the call site
+        cursor = await db.execute(
+            """
+            SELECT * FROM messages
+            WHERE id BETWEEN ? AND ? AND content REGEXP ?
+            ORDER BY id LIMIT ? OFFSET ?
+            """,
+            (start_id, end_id, pattern, limit, offset),
+        )
+    else:
+        escaped = (
+            pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        cursor = await db.execute(
+            """
+            SELECT * FROM messages
+            WHERE id BETWEEN ? AND ? AND content LIKE ? ESCAPE '\\'
+            ORDER BY id LIMIT ? OFFSET ?
+            """,
+            (start_id, end_id, f"%{escaped}%", limit, offset),
+        )
+    return [Message.from_row(row) for row in await cursor.fetchall()]
 
 
 async def count_messages(
@@ -190,19 +321,39 @@ async def total_tokens(db: aiosqlite.Connection, session_id: str | None = None)
 async def get_unsummarized_messages(
     db: aiosqlite.Connection, session_id: str
 ) -> list[Message]:
-    """Get messages that don't have a covering summary yet."""
+    """Get messages that don't have a covering summary yet.
+
+    Written as a left anti-join against the session's summary intervals
+    (collected once in a CTE) rather than a correlated NOT EXISTS per
+    message, which re-probed summaries for every row.
+    """
     cursor = await db.execute(
         """
-        SELECT m.* FROM messages m
-        WHERE m.session_id = ?
-        AND NOT EXISTS (
-            SELECT 1 FROM summaries s
-            WHERE s.session_id = m.session_id
-            AND s.msg_start_id <= m.id
-            AND s.msg_end_id >= m.id
+        WITH covered AS (
+            SELECT msg_start_id, msg_end_id FROM summaries WHERE session_id = ?
         )
+        SELECT m.id, m.session_id, m.role, m.content, m.token_estimate,
+               m.timestamp, m.metadata
+        FROM messages m
+        LEFT JOIN covered c ON m.id BETWEEN c.msg_start_id AND c.msg_end_id
+        WHERE m.session_id = ? AND c.msg_start_id IS NULL
         ORDER BY m.id
         """,
-        (session_id,),
+        (session_id, session_id),
     )
-    return [Message.from_row(row) for row in await cursor.fetchall()]
+    # Unbounded session scan — decode positionally like get_messages_by_range
+    cursor.row_factory = None
+    results: list[Message] = []
+    async for id_, sid, role, content, tok, ts, meta in cursor:
+        results.append(
+            Message(
+                id=id_,
+                session_id=sid,
+                role=role,
+                content=content,
+                token_estimate=tok,
+                timestamp=ts,
+                metadata=_parse_metadata(meta),
+            )
+        )
+    return results
@@ -0,0 +1,62 @@
+"""Connection pool: one writer + N read-only connections.
+
+Under WAL, readers never block each other or the writer, so the
+read-heavy tools (lcm_grep, lcm_describe, lcm_expand, lcm_status) can
+run truly in parallel across the pool's worker threads while all
+writes stay on the single writer connection (avoiding SQLITE_BUSY
+between writers).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import aiosqlite
+
+from lcm.store.database import get_db, get_readonly_db
+
+
+class ConnectionPool:
+    """Lazily-opened writer plus a round-robin pool of readers."""
+
+    def __init__(self, db_path: str | Path | None = None, readers: int = 4):
+        self._db_path = db_path
+        self._pool_size = readers
+        self._writer: aiosqlite.Connection | None = None
+        self._readers: list[aiosqlite.Connection] = []
+        self._next_reader = 0
+        # Serializes first-use initialization: concurrent callers must
+        # not each open a writer (the loser's worker thread would leak)
+        # or append a duplicate reader set
+        self._init_lock = asyncio.Lock()
+
+    async def writer(self) -> aiosqlite.Connection:
+        """The single write connection (opens the DB and runs migrations)."""
+        if self._writer is None:
+            async with self._init_lock:
+                if self._writer is None:
+                    self._writer = await get_db(self._db_path)
+        return self._writer
+
+    async def reader(self) -> aiosqlite.Connection:
+        """A read-only connection, round-robin across the pool."""
+        if not self._readers:
+            # The writer opens first so migrations run before any reader
+            await self.writer()
+            async with self._init_lock:
+                if not self._readers:
+                    for _ in range(self._pool_size):
+                        self._readers.append(await get_readonly_db(self._db_path))
+        conn = self._readers[self._next_reader % len(self._readers)]
+        self._next_reader += 1
+        return conn
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        for conn in self._readers:
+            await conn.close()
+        self._readers.clear()
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
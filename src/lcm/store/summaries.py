@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass, field
 
 import aiosqlite
 
+from lcm import _json
+from lcm.store.database import transaction
+from lcm.store.messages import _parse_metadata
+
 
 @dataclass
 class Summary:
@@ -33,7 +36,8 @@ class Summary:
             timestamp=row["timestamp"],
             msg_start_id=row["msg_start_id"],
             msg_end_id=row["msg_end_id"],
-            metadata=json.loads(row["metadata"]) if row["metadata"] else {},
+            # metadata is almost always '{}' — skip the parse on that path
+            metadata=_parse_metadata(row["metadata"]),
         )
 
 
@@ -64,7 +68,7 @@ async def create_leaf_summary(
             mode,
             msg_start_id,
             msg_end_id,
-            json.dumps(metadata or {}),
+            _json.dumps(metadata or {}),
         ),
     )
     await db.commit()
@@ -84,12 +88,14 @@ async def create_condensed_summary(
     if token_estimate == 0:
         token_estimate = max(1, len(content) // 4)
 
-    # Find the overall message range from children
+    # Overall message range and level (max child level + 1) from the
+    # children, in a single aggregate query
     if child_ids:
         placeholders = ",".join("?" * len(child_ids))
         cursor = await db.execute(
             f"""
-            SELECT MIN(msg_start_id) as min_start, MAX(msg_end_id) as max_end
+            SELECT MIN(msg_start_id) as min_start, MAX(msg_end_id) as max_end,
+                   MAX(level) as max_level
             FROM summaries WHERE id IN ({placeholders})
             """,
             child_ids,
@@ -97,48 +103,41 @@ async def create_condensed_summary(
         row = await cursor.fetchone()
         msg_start_id = row["min_start"]
         msg_end_id = row["max_end"]
+        level = (row["max_level"] or 0) + 1
     else:
         msg_start_id = None
         msg_end_id = None
+        level = 1
 
-    # Determine level (max child level + 1)
-    if child_ids:
+    # Parent row and its links commit (and roll back) as one unit; the
+    # immediate transaction takes the write lock before the first insert
+    async with transaction(db, immediate=True):
         cursor = await db.execute(
-            f"SELECT MAX(level) as max_level FROM summaries WHERE id IN ({placeholders})",
-            child_ids,
+            """
+            INSERT INTO summaries (session_id, level, content, token_estimate, mode,
+                                   msg_start_id, msg_end_id, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                session_id,
+                level,
+                content,
+                token_estimate,
+                mode,
+                msg_start_id,
+                msg_end_id,
+                _json.dumps(metadata or {}),
+            ),
         )
-        row = await cursor.fetchone()
-        level = (row["max_level"] or 0) + 1
-    else:
-        level = 1
-
-    cursor = await db.execute(
-        """
-        INSERT INTO summaries (session_id, level, content, token_estimate, mode,
-                               msg_start_id, msg_end_id, metadata)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            session_id,
-            level,
-            content,
-            token_estimate,
-            mode,
-            msg_start_id,
-            msg_end_id,
-            json.dumps(metadata or {}),
-        ),
-    )
-    parent_id = cursor.lastrowid
+        parent_id = cursor.lastrowid
 
-    # Create links
-    for child_id in child_ids:
-        await db.execute(
-            "INSERT INTO summary_links (parent_id, child_id) VALUES (?, ?)",
-            (parent_id, child_id),
-        )
+        # One executemany instead of a round-trip per child
+        if child_ids:
+            await db.executemany(
+                "INSERT INTO summary_links (parent_id, child_id) VALUES (?, ?)",
+                [(parent_id, child_id) for child_id in child_ids],
+            )
 
-    await db.commit()
     return parent_id
 
 
@@ -163,6 +162,35 @@ async def get_children(db: aiosqlite.Connection, summary_id: int) -> list[Summar
     return [Summary.from_row(row) for row in await cursor.fetchall()]
 
 
+async def get_summary_with_children(
+    db: aiosqlite.Connection, summary_id: int
+) -> tuple[Summary | None, list[Summary]]:
+    """Fetch a summary and its children in one query.
+
+    lcm_describe and lcm_expand always want both; fusing the lookups
+    halves the round-trips on those paths.
+    """
+    cursor = await db.execute(
+        """
+        SELECT s.*, 0 AS __is_child FROM summaries s WHERE s.id = ?
+        UNION ALL
+        SELECT c.*, 1 AS __is_child FROM summaries c
+        JOIN summary_links sl ON c.id = sl.child_id
+        WHERE sl.parent_id = ?
+        ORDER BY __is_child, msg_start_id
+        """,
+        (summary_id, summary_id),
+    )
+    summary: Summary | None = None
+    children: list[Summary] = []
+    async for row in cursor:
+        if row["__is_child"]:
+            children.append(Summary.from_row(row))
+        else:
+            summary = Summary.from_row(row)
+    return summary, children
+
+
 async def get_parents(db: aiosqlite.Connection, summary_id: int) -> list[Summary]:
     """Get parent summaries that contain this node."""
     cursor = await db.execute(
@@ -179,10 +207,14 @@ async def get_parents(db: aiosqlite.Connection, summary_id: int) -> list[Summary
 async def get_covering_summary(
     db: aiosqlite.Connection, message_id: int
 ) -> Summary | None:
-    """Find the highest-level summary covering a given message ID."""
+    """Find the highest-level summary covering a given message ID.
+
+    Pinned to the range+level index: the seek stays on msg_start_id and
+    the candidates come back level-descending, so LIMIT 1 stops early.
+    """
     cursor = await db.execute(
         """
-        SELECT s.* FROM summaries s
+        SELECT s.* FROM summaries s INDEXED BY idx_summaries_range_level
         WHERE s.msg_start_id <= ? AND s.msg_end_id >= ?
         ORDER BY s.level DESC
         LIMIT 1
@@ -193,6 +225,36 @@ async def get_covering_summary(
     return Summary.from_row(row) if row else None
 
 
+async def get_covering_summaries_bulk(
+    db: aiosqlite.Connection, message_ids: list[int]
+) -> dict[int, Summary]:
+    """Highest-level covering summary for each message ID, in one query.
+
+    Replaces a get_covering_summary call per message (N+1) when grouping
+    search results. IDs with no covering summary are absent from the map.
+    """
+    if not message_ids:
+        return {}
+
+    placeholders = ",".join("(?)" for _ in message_ids)
+    cursor = await db.execute(
+        f"""
+        WITH ids(msg_id) AS (VALUES {placeholders})
+        SELECT * FROM (
+            SELECT i.msg_id AS __msg_id, s.*,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY i.msg_id ORDER BY s.level DESC
+                   ) AS __rn
+            FROM ids i
+            JOIN summaries s INDEXED BY idx_summaries_range_level
+              ON s.msg_start_id <= i.msg_id AND s.msg_end_id >= i.msg_id
+        ) WHERE __rn = 1
+        """,
+        message_ids,
+    )
+    return {row["__msg_id"]: Summary.from_row(row) for row in await cursor.fetchall()}
+
+
 async def get_top_level_summaries(
     db: aiosqlite.Connection, session_id: str
 ) -> list[Summary]:
@@ -200,8 +262,8 @@ async def get_top_level_summaries(
     cursor = await db.execute(
         """
         SELECT s.* FROM summaries s
-        WHERE s.session_id = ?
-        AND s.id NOT IN (SELECT child_id FROM summary_links)
+        LEFT JOIN summary_links sl ON sl.child_id = s.id
+        WHERE s.session_id = ? AND sl.child_id IS NULL
         ORDER BY s.msg_start_id
         """,
         (session_id,),
@@ -216,8 +278,8 @@ async def get_leaf_summaries(
     cursor = await db.execute(
         """
         SELECT s.* FROM summaries s
-        WHERE s.session_id = ? AND s.level = 0
-        AND s.id NOT IN (SELECT child_id FROM summary_links)
+        LEFT JOIN summary_links sl ON sl.child_id = s.id
+        WHERE s.session_id = ? AND s.level = 0 AND sl.child_id IS NULL
         ORDER BY s.msg_start_id
         """,
         (session_id,),
@@ -2,32 +2,39 @@
 
 from __future__ import annotations
 
-import json
-
 import aiosqlite
 
 from lcm.store.files import FileRef, get_file_ref
 from lcm.store.messages import (
     Message,
+    count_messages_in_range,
+    get_message,
     get_messages_by_range,
     search_messages_fts,
+    search_messages_in_range,
     search_messages_regex,
 )
 from lcm.store.summaries import (
     Summary,
-    get_children,
+    get_covering_summaries_bulk,
     get_covering_summary,
     get_summary,
+    get_summary_with_children,
 )
 
 PAGE_SIZE = 10
 
 
+def _truncate(text: str, limit: int = 500) -> str:
+    """Clip long content for display; short text passes through unsliced."""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
 def _format_message(msg: Message) -> dict:
     return {
         "id": msg.id,
         "role": msg.role,
-        "content": msg.content[:500] + ("..." if len(msg.content) > 500 else ""),
+        "content": _truncate(msg.content),
         "timestamp": msg.timestamp,
         "tokens": msg.token_estimate,
     }
@@ -38,7 +45,7 @@ def _format_summary(s: Summary) -> dict:
         "id": f"S{s.id}",
         "level": s.level,
         "mode": s.mode,
-        "content": s.content[:500] + ("..." if len(s.content) > 500 else ""),
+        "content": _truncate(s.content),
         "msg_range": f"{s.msg_start_id}-{s.msg_end_id}",
         "tokens": s.token_estimate,
         "timestamp": s.timestamp,
@@ -66,45 +73,47 @@ async def lcm_grep(
         if not summary:
             return {"error": f"Summary S{summary_id} not found"}
 
-        messages = await get_messages_by_range(
-            db, summary.msg_start_id, summary.msg_end_id
+        # Filter and paginate in SQL; fetch one extra row so has_more
+        # reflects whether matches remain past this page
+        matches = await search_messages_in_range(
+            db,
+            pattern,
+            summary.msg_start_id,
+            summary.msg_end_id,
+            use_regex=use_regex,
+            limit=PAGE_SIZE + 1,
+            offset=offset,
         )
-        # Filter by pattern
-        import re
-
-        compiled = re.compile(pattern, re.IGNORECASE) if use_regex else None
-        filtered = []
-        for msg in messages:
-            if use_regex and compiled and compiled.search(msg.content):
-                filtered.append(msg)
-            elif not use_regex and pattern.lower() in msg.content.lower():
-                filtered.append(msg)
-
-        total = len(filtered)
-        page_results = filtered[offset : offset + PAGE_SIZE]
+        has_more = len(matches) > PAGE_SIZE
+        page_results = matches[:PAGE_SIZE]
     else:
-        # Global search
+        # Global search — also one row beyond the page, so has_more is
+        # exact without a COUNT(*) over the match set
         if use_regex:
             results = await search_messages_regex(
-                db, pattern, session_id=session_id, limit=PAGE_SIZE, offset=offset
+                db, pattern, session_id=session_id, limit=PAGE_SIZE + 1, offset=offset
             )
         else:
             try:
                 results = await search_messages_fts(
-                    db, pattern, session_id=session_id, limit=PAGE_SIZE, offset=offset
+                    db, pattern, session_id=session_id,
+                    limit=PAGE_SIZE + 1, offset=offset,
                 )
             except Exception:
                 # Fall back to regex on FTS5 syntax errors
                 results = await search_messages_regex(
-                    db, pattern, session_id=session_id, limit=PAGE_SIZE, offset=offset
+                    db, pattern, session_id=session_id,
+                    limit=PAGE_SIZE + 1, offset=offset,
                 )
-        page_results = results
-        total = len(results)  # Approximate; FTS5 doesn't cheaply give total
+        has_more = len(results) > PAGE_SIZE
+        page_results = results[:PAGE_SIZE]
 
-    # Group by covering summary
+    # Group by covering summary — one bulk lookup for the whole page
+    # instead of a query per hit
+    covering_map = await get_covering_summaries_bulk(db, [m.id for m in page_results])
     grouped: dict[str, dict] = {}
     for msg in page_results:
-        covering = await get_covering_summary(db, msg.id)
+        covering = covering_map.get(msg.id)
         key = f"S{covering.id}" if covering else "unsummarized"
         if key not in grouped:
             grouped[key] = {
@@ -121,7 +130,7 @@ async def lcm_grep(
         "page": page,
         "page_size": PAGE_SIZE,
         "results": list(grouped.values()),
-        "has_more": total >= PAGE_SIZE,
+        "has_more": has_more,
     }
 
 
@@ -132,11 +141,10 @@ async def lcm_describe(db: aiosqlite.Connection, lcm_id: str) -> dict:
     """
     if lcm_id.startswith("S"):
         summary_id = int(lcm_id[1:])
-        summary = await get_summary(db, summary_id)
+        summary, children = await get_summary_with_children(db, summary_id)
         if not summary:
             return {"error": f"Summary {lcm_id} not found"}
 
-        children = await get_children(db, summary_id)
         return {
             "type": "summary",
             **_format_summary(summary),
@@ -161,8 +169,6 @@ async def lcm_describe(db: aiosqlite.Connection, lcm_id: str) -> dict:
 
     else:
         # Assume message ID
-        from lcm.store.messages import get_message
-
         try:
             msg_id = int(lcm_id)
         except ValueError:
@@ -187,7 +193,7 @@ async def lcm_expand(
     page: int = 1,
 ) -> dict:
     """Expand a summary to its constituent messages. Paginated."""
-    summary = await get_summary(db, summary_id)
+    summary, children = await get_summary_with_children(db, summary_id)
     if not summary:
         return {"error": f"Summary S{summary_id} not found"}
 
@@ -198,14 +204,15 @@ async def lcm_expand(
             "note": "No message range associated with this summary",
         }
 
+    # Page in SQL: a cheap range COUNT for the total, then only the
+    # page's rows cross the thread boundary instead of the whole range
     offset = (page - 1) * PAGE_SIZE
-    messages = await get_messages_by_range(db, summary.msg_start_id, summary.msg_end_id)
-
-    total = len(messages)
-    page_messages = messages[offset : offset + PAGE_SIZE]
-
-    # Also get child summaries if this is a condensed node
-    children = await get_children(db, summary_id)
+    total = await count_messages_in_range(
+        db, summary.msg_start_id, summary.msg_end_id
+    )
+    page_messages = await get_messages_by_range(
+        db, summary.msg_start_id, summary.msg_end_id, limit=PAGE_SIZE, offset=offset
+    )
 
     return {
         "summary": _format_summary(summary),
@@ -4,9 +4,21 @@ from __future__ import annotations
 
 import asyncio
 import json
+import random
+from collections.abc import Iterator
 from pathlib import Path
 
-from lcm.llm.client import agent_loop, classify
+from lcm import _json
+from lcm.llm.client import agent_loop, classify, classify_batch
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with jitter for retry attempt N (0-based).
+
+    The jitter spreads retries out so a burst of simultaneous failures
+    doesn't come back as a simultaneous burst of retries.
+    """
+    return 0.5 * (2**attempt) + random.uniform(0, 0.5)
 
 
 async def llm_map(
@@ -15,11 +27,18 @@ async def llm_map(
     output_schema: dict | None = None,
     concurrency: int = 16,
     max_retries: int = 3,
+    batch_size: int = 1,
 ) -> dict:
     """Process each line of a JSONL file with a stateless LLM call.
 
     Fan out Haiku calls via asyncio with a semaphore for concurrency control.
     Validates against schema, retries failures.
+    With batch_size > 1, groups of items share one API call (useful when
+    throughput is capped by requests/min rather than tokens/min); items the
+    batch response misses fall back to individual calls.
+    Input is streamed and output written as results complete, so memory
+    stays O(concurrency) rather than O(file size); output lines are in
+    completion order.
     Returns path to output JSONL + stats.
     """
     input_file = Path(input_path)
@@ -27,43 +46,93 @@ async def llm_map(
         return {"error": f"Input file not found: {input_path}"}
 
     output_path = input_file.with_suffix(".out.jsonl")
-    items = _read_jsonl(input_file)
 
-    if not items:
-        return {"error": "Empty input file or no valid JSONL lines"}
-
-    semaphore = asyncio.Semaphore(concurrency)
-    results: list[dict | None] = [None] * len(items)
+    chunk_size = max(1, batch_size)
+    job_queue: asyncio.Queue[tuple[int, list[dict]] | None] = asyncio.Queue(
+        maxsize=concurrency * 4
+    )
+    out_queue: asyncio.Queue[dict | None] = asyncio.Queue()
+    stats = {"total": 0, "successful": 0, "failed": 0}
     errors: list[dict] = []
 
-    async def process_item(idx: int, item: dict) -> None:
-        async with semaphore:
-            for attempt in range(max_retries):
+    async def process_item(idx: int, item: dict) -> dict | None:
+        for attempt in range(max_retries):
+            try:
+                return await classify(
+                    item=item, prompt=prompt, output_schema=output_schema
+                )
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    stats["failed"] += 1
+                    if len(errors) < 10:  # Cap error list
+                        errors.append({"index": idx, "error": str(e), "item": item})
+                    return None
+            await asyncio.sleep(_backoff(attempt))
+        return None
+
+    async def worker() -> None:
+        while True:
+            job = await job_queue.get()
+            if job is None:
+                return
+            start, chunk = job
+            if len(chunk) > 1:
                 try:
-                    result = await classify(
-                        item=item, prompt=prompt, output_schema=output_schema
+                    outputs = await classify_batch(
+                        chunk, prompt=prompt, output_schema=output_schema
                     )
-                    results[idx] = result
+                except Exception:
+                    outputs = [None] * len(chunk)
+            else:
+                outputs = [None]
+            for offset, output in enumerate(outputs):
+                if output is None:
+                    # Batch miss (or single item) — per-item retry path
+                    output = await process_item(start + offset, chunk[offset])
+                if output is not None:
+                    stats["successful"] += 1
+                    await out_queue.put(output)
+
+    async def producer() -> None:
+        chunk: list[dict] = []
+        start = 0
+        for item in _iter_jsonl(input_file):
+            chunk.append(item)
+            stats["total"] += 1
+            if len(chunk) >= chunk_size:
+                await job_queue.put((start, chunk))
+                start += len(chunk)
+                chunk = []
+        if chunk:
+            await job_queue.put((start, chunk))
+        for _ in range(concurrency):
+            await job_queue.put(None)
+
+    async def writer() -> None:
+        with open(output_path, "w") as f:
+            while True:
+                result = await out_queue.get()
+                if result is None:
                     return
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        errors.append(
-                            {"index": idx, "error": str(e), "item": item}
-                        )
+                f.write(_json.dumps(result) + "\n")
 
-    tasks = [process_item(i, item) for i, item in enumerate(items)]
-    await asyncio.gather(*tasks)
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    writer_task = asyncio.create_task(writer())
+    await producer()
+    await asyncio.gather(*workers)
+    await out_queue.put(None)
+    await writer_task
 
-    # Write output
-    successful = [r for r in results if r is not None]
-    _write_jsonl(output_path, successful)
+    if stats["total"] == 0:
+        output_path.unlink(missing_ok=True)
+        return {"error": "Empty input file or no valid JSONL lines"}
 
     return {
         "output_path": str(output_path),
-        "total_items": len(items),
-        "successful": len(successful),
-        "failed": len(errors),
-        "errors": errors[:10],  # Cap error list
+        "total_items": stats["total"],
+        "successful": stats["successful"],
+        "failed": stats["failed"],
+        "errors": errors,
     }
 
 
@@ -79,23 +148,25 @@ async def agentic_map(
 
     Each item gets a multi-turn conversation with tool access.
     Lower concurrency than llm_map due to higher cost per item.
+    Input is streamed and each result is written as its agent finishes,
+    so memory stays O(concurrency); output lines are in completion order.
     """
     input_file = Path(input_path)
     if not input_file.exists():
         return {"error": f"Input file not found: {input_path}"}
 
     output_path = input_file.with_suffix(".agent_out.jsonl")
-    items = _read_jsonl(input_file)
-
-    if not items:
-        return {"error": "Empty input file or no valid JSONL lines"}
 
     semaphore = asyncio.Semaphore(concurrency)
-    results: list[dict | None] = [None] * len(items)
+    out_queue: asyncio.Queue[dict | None] = asyncio.Queue()
+    stats = {"successful": 0}
     errors: list[dict] = []
+    total = 0
 
     async def process_item(idx: int, item: dict) -> None:
-        async with semaphore:
+        # Arrives holding the semaphore slot the spawn loop acquired
+        holding = True
+        try:
             for attempt in range(max_retries):
                 try:
                     result = await agent_loop(
@@ -104,46 +175,77 @@ async def agentic_map(
                         output_schema=output_schema,
                         read_only=read_only,
                     )
-                    results[idx] = result
+                    stats["successful"] += 1
+                    await out_queue.put(result)
                     return
                 except Exception as e:
                     if attempt == max_retries - 1:
                         errors.append(
                             {"index": idx, "error": str(e), "item": item}
                         )
+                        return
+                # Give the slot up while backing off so a stuck item
+                # doesn't hold concurrency below the intended level
+                holding = False
+                semaphore.release()
+                await asyncio.sleep(_backoff(attempt))
+                await semaphore.acquire()
+                holding = True
+        finally:
+            if holding:
+                semaphore.release()
+
+    # Stream results to disk as agents finish instead of buffering the
+    # full output list until the end — same writer pattern as llm_map
+    async def writer() -> None:
+        with open(output_path, "w") as f:
+            while True:
+                result = await out_queue.get()
+                if result is None:
+                    return
+                f.write(_json.dumps(result) + "\n")
+
+    writer_task = asyncio.create_task(writer())
 
-    tasks = [process_item(i, item) for i, item in enumerate(items)]
-    await asyncio.gather(*tasks)
+    # Stream the input: acquiring before spawning bounds live tasks at
+    # `concurrency`, so only that many parsed items are in flight rather
+    # than the whole file materialized up front
+    async with asyncio.TaskGroup() as tg:
+        for i, item in enumerate(_iter_jsonl(input_file)):
+            total += 1
+            await semaphore.acquire()
+            tg.create_task(process_item(i, item))
 
-    successful = [r for r in results if r is not None]
-    _write_jsonl(output_path, successful)
+    await out_queue.put(None)
+    await writer_task
+
+    if total == 0:
+        output_path.unlink(missing_ok=True)
+        return {"error": "Empty input file or no valid JSONL lines"}
 
     return {
         "output_path": str(output_path),
-        "total_items": len(items),
-        "successful": len(successful),
+        "total_items": total,
+        "successful": stats["successful"],
         "failed": len(errors),
         "errors": errors[:10],
     }
 
 
-def _read_jsonl(path: Path) -> list[dict]:
-    """Read a JSONL file, skipping invalid lines."""
-    items = []
-    with open(path) as f:
+def _iter_jsonl(path: Path) -> Iterator[dict]:
+    """Yield items from a JSONL file one at a time, skipping invalid lines.
+
+    Binary mode with a 1MB buffer: the parser takes the raw bytes
+    directly (no per-line decode) and large files need fewer reads.
+    A generator rather than a list so callers can overlap parsing with
+    processing and never hold the whole file in memory.
+    """
+    with open(path, "rb", buffering=1 << 20) as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                items.append(json.loads(line))
+                yield _json.loads(line)
             except json.JSONDecodeError:
                 continue
-    return items
-
-
-def _write_jsonl(path: Path, items: list[dict]) -> None:
-    """Write items to a JSONL file."""
-    with open(path, "w") as f:
-        for item in items:
-            f.write(json.dumps(item) + "\n")
@@ -2,24 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
+
 import aiosqlite
 
-from lcm.store.messages import count_messages, total_tokens
-from lcm.store.summaries import (
-    Summary,
-    count_summaries,
-    get_dag_depth,
-    get_top_level_summaries,
-)
+from lcm.store.summaries import Summary, get_top_level_summaries
+
+
+async def _session_aggregates(
+    db: aiosqlite.Connection, session_id: str
+) -> tuple[int, int, int, int]:
+    """All four status scalars in one statement.
+
+    Lives here rather than in the store because it spans both the
+    messages and summaries tables, which keep per-table helpers.
+    """
+    cursor = await db.execute(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM messages WHERE session_id = ?),
+            (SELECT COALESCE(SUM(token_estimate), 0) FROM messages WHERE session_id = ?),
+            (SELECT COUNT(*) FROM summaries WHERE session_id = ?),
+            (SELECT COALESCE(MAX(level), 0) FROM summaries WHERE session_id = ?)
+        """,
+        (session_id, session_id, session_id, session_id),
+    )
+    row = await cursor.fetchone()
+    return row[0], row[1], row[2], row[3]
 
 
 async def lcm_status(db: aiosqlite.Connection, session_id: str) -> dict:
     """Return session stats: message count, summary count, tokens, DAG info."""
-    msg_count = await count_messages(db, session_id)
-    sum_count = await count_summaries(db, session_id)
-    tokens = await total_tokens(db, session_id)
-    depth = await get_dag_depth(db, session_id)
-    top_level = await get_top_level_summaries(db, session_id)
+    # One statement for the scalars, gathered with the row-returning query
+    (msg_count, tokens, sum_count, depth), top_level = await asyncio.gather(
+        _session_aggregates(db, session_id),
+        get_top_level_summaries(db, session_id),
+    )
 
     return {
         "session_id": session_id,
@@ -0,0 +1,60 @@
+"""Shared fixtures — one in-memory database per module, wiped between tests."""
+
+from __future__ import annotations
+
+import pytest
+
+from lcm.hooks import inject
+from lcm.store.database import get_db
+from lcm.store.messages import estimate_tokens, insert_messages_bulk
+
+# Deletion order respects the summary_links foreign keys
+_TABLES = ("summary_links", "summaries", "messages", "large_files")
+
+
+async def bulk_insert(db, session_id, pairs):
+    """Insert (role, content) pairs in one transaction. Returns (first_id, last_id).
+
+    Fixtures that seed dozens of messages pay one commit instead of one
+    per row via the store's executemany path.
+    """
+    rows = [
+        (session_id, role, content, estimate_tokens(content), "{}")
+        for role, content in pairs
+    ]
+    await insert_messages_bulk(db, rows)
+    cursor = await db.execute("SELECT last_insert_rowid()")
+    last = (await cursor.fetchone())[0]
+    return last - len(rows) + 1, last
+
+
+@pytest.fixture(scope="module")
+async def _db_conn():
+    """One in-memory connection shared by a test module.
+
+    Schema bootstrap (tables, FTS5 virtual table, triggers, migrations)
+    runs once per module instead of once per test, and :memory: skips
+    the file-system fsyncs a tmp_path database pays on every commit.
+    """
+    conn = await get_db(":memory:")
+    yield conn
+    await conn.close()
+
+
+@pytest.fixture
+async def db(_db_conn):
+    """The module connection, wiped after each test.
+
+    Deleting rows (rather than reopening) preserves per-test isolation;
+    resetting sqlite_sequence keeps autoincrement IDs starting at 1,
+    which several tests assert on.
+    """
+    yield _db_conn
+    for table in _TABLES:
+        await _db_conn.execute(f"DELETE FROM {table}")
+    await _db_conn.execute("DELETE FROM sqlite_sequence")
+    await _db_conn.commit()
+    # The injection cache keys on (session_id, MAX(summary id), budget),
+    # which assumes summary IDs never recur. Resetting sqlite_sequence
+    # breaks that assumption across tests, so drop the cache with the data.
+    inject._inject_cache.clear()
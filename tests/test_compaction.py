@@ -15,23 +15,17 @@ from lcm.compaction.engine import (
     CompactionStats,
 )
 from lcm.compaction.escalation import EscalationResult, escalated_summarize, _truncate_deterministic
-from lcm.store.database import get_db
-from lcm.store.messages import insert_message
+from lcm.store.messages import Message, insert_message
 from lcm.store.summaries import (
     count_summaries,
+    create_condensed_summary,
+    create_leaf_summary,
     get_leaf_summaries,
+    get_summary,
     get_top_level_summaries,
 )
 
 
-@pytest.fixture
-async def db(tmp_path):
-    db_path = tmp_path / "test.db"
-    conn = await get_db(db_path)
-    yield conn
-    await conn.close()
-
-
 # --- Escalation Tests ---
 
 
@@ -99,8 +93,6 @@ class TestEscalation:
 
 class TestBlockSplitting:
     def test_single_small_block(self):
-        from lcm.store.messages import Message
-
         msgs = [
             Message(id=i, session_id="s1", role="user", content=f"M{i}",
                     token_estimate=10, timestamp="", metadata={})
@@ -111,8 +103,6 @@ class TestBlockSplitting:
         assert len(blocks[0]) == 3
 
     def test_split_large_list(self):
-        from lcm.store.messages import Message
-
         msgs = [
             Message(id=i, session_id="s1", role="user", content=f"M{i}",
                     token_estimate=10, timestamp="", metadata={})
@@ -161,8 +151,6 @@ class TestCompaction:
         )
 
         # Create 6 leaf summaries manually
-        from lcm.store.summaries import create_leaf_summary
-
         for i in range(6):
             start = i * 10 + 1
             end = start + 9
@@ -185,8 +173,6 @@ class TestCompaction:
             content="Summary", level=1, mode="preserve_details", token_estimate=20
         )
 
-        from lcm.store.summaries import create_leaf_summary, create_condensed_summary, get_summary
-
         c1 = await create_leaf_summary(db, "s1", "L1", msg_start_id=1, msg_end_id=50)
         c2 = await create_leaf_summary(db, "s1", "L2", msg_start_id=51, msg_end_id=100)
 
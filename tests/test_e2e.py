@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 
 import pytest
 
 from lcm.store.database import get_db
-from lcm.store.messages import count_messages, insert_message, total_tokens
+from lcm.store.messages import count_messages, total_tokens
+from tests.conftest import bulk_insert
 from lcm.store.summaries import create_leaf_summary
 from lcm.tools.memory import lcm_describe, lcm_expand, lcm_grep
 from lcm.tools.status import lcm_status
@@ -33,43 +35,60 @@ CONVERSATION = [
 ]
 
 
-@pytest.fixture
-async def db(tmp_path):
-    db_path = tmp_path / "e2e.db"
-    conn = await get_db(db_path)
-    yield conn
-    await conn.close()
+# The conversation and summaries are built once per module into template
+# databases; each test restores a template into its connection with the
+# SQLite backup API (an in-memory page copy) instead of re-running the
+# inserts per test.
 
 
-@pytest.fixture
-async def populated_db(db):
-    """DB with all conversation messages inserted."""
-    for role, content in CONVERSATION:
-        await insert_message(db, SESSION, role, content)
-    return db
+@pytest.fixture(scope="module")
+async def _populated_template():
+    """Template DB with all conversation messages inserted."""
+    conn = await get_db(":memory:")
+    await bulk_insert(conn, SESSION, CONVERSATION)
+    yield conn
+    await conn.close()
 
 
-@pytest.fixture
-async def summarized_db(populated_db):
-    """DB with messages and two leaf summaries."""
-    db = populated_db
+@pytest.fixture(scope="module")
+async def _summarized_template():
+    """Template DB with messages and two leaf summaries."""
+    conn = await get_db(":memory:")
+    await bulk_insert(conn, SESSION, CONVERSATION)
     await create_leaf_summary(
-        db, SESSION,
+        conn, SESSION,
         "Set up FastAPI project with JWT auth and SQLAlchemy. Created User model with id/email/hashed_password. Added /register and /login endpoints.",
         msg_start_id=1, msg_end_id=8,
     )
     await create_leaf_summary(
-        db, SESSION,
+        conn, SESSION,
         "Added protected GET /users/me endpoint with JWT dependency. Added rate limiting (slowapi+Redis): 5/min register, 10/min login. Wrote 6 auth tests — all pass.",
         msg_start_id=9, msg_end_id=14,
     )
+    yield conn
+    await conn.close()
+
+
+@pytest.fixture
+async def populated_db(db, _populated_template):
+    await _populated_template.backup(db)
+    return db
+
+
+@pytest.fixture
+async def summarized_db(db, _summarized_template):
+    await _summarized_template.backup(db)
     return db
 
 
 class TestE2EPipeline:
     async def test_message_insertion(self, populated_db):
-        assert await count_messages(populated_db, SESSION) == 14
-        assert await total_tokens(populated_db, SESSION) > 0
+        count, tokens = await asyncio.gather(
+            count_messages(populated_db, SESSION),
+            total_tokens(populated_db, SESSION),
+        )
+        assert count == 14
+        assert tokens > 0
 
     async def test_status_before_compaction(self, populated_db):
         status = await lcm_status(populated_db, SESSION)
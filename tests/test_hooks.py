@@ -9,19 +9,10 @@ import pytest
 
 from lcm.hooks.capture import _extract_message, capture_new_messages
 from lcm.hooks.inject import build_injection_text
-from lcm.store.database import get_db
 from lcm.store.messages import count_messages
 from lcm.store.summaries import create_leaf_summary
 
 
-@pytest.fixture
-async def db(tmp_path):
-    db_path = tmp_path / "test.db"
-    conn = await get_db(db_path)
-    yield conn
-    await conn.close()
-
-
 # --- Transcript Parsing ---
 
 
@@ -78,39 +69,39 @@ class TestExtractMessage:
 # --- Capture Diff Logic ---
 
 
-class TestCapture:
-    async def test_capture_from_transcript(self, db, tmp_path):
-        # Create a fake transcript
-        transcript = tmp_path / "transcript.jsonl"
-        transcript.write_text(
-            json.dumps({"type": "message", "role": "user", "content": "First"}) + "\n"
-            + json.dumps({"type": "message", "role": "assistant", "content": "Reply"}) + "\n"
-        )
+@pytest.fixture(scope="module")
+def transcript_base(tmp_path_factory):
+    """A standard two-line transcript, written once for the module."""
+    path = tmp_path_factory.mktemp("transcripts") / "transcript.jsonl"
+    path.write_text(
+        json.dumps({"type": "message", "role": "user", "content": "First"}) + "\n"
+        + json.dumps({"type": "message", "role": "assistant", "content": "Reply"}) + "\n"
+    )
+    return path
+
 
-        result = await capture_new_messages(db, "capture_basic", str(transcript), state_dir=tmp_path)
+class TestCapture:
+    async def test_capture_from_transcript(self, db, transcript_base, tmp_path):
+        result = await capture_new_messages(db, "capture_basic", str(transcript_base), state_dir=tmp_path)
         assert result["captured"] == 2
 
         count = await count_messages(db, "capture_basic")
         assert count == 2
 
-    async def test_capture_incremental(self, db, tmp_path):
-        transcript = tmp_path / "transcript.jsonl"
-        transcript.write_text(
-            json.dumps({"type": "message", "role": "user", "content": "First"}) + "\n"
-        )
-
-        result1 = await capture_new_messages(db, "capture_incr", str(transcript), state_dir=tmp_path)
-        assert result1["captured"] == 1
+    async def test_capture_incremental(self, db, transcript_base, tmp_path):
+        result1 = await capture_new_messages(db, "capture_incr", str(transcript_base), state_dir=tmp_path)
+        assert result1["captured"] == 2
 
-        # Append more lines
-        with open(transcript, "a") as f:
+        # Append a line rather than rewriting the prefix — the second
+        # capture should pick up only the new suffix
+        with open(transcript_base, "a") as f:
             f.write(json.dumps({"type": "message", "role": "user", "content": "Second"}) + "\n")
 
-        result2 = await capture_new_messages(db, "capture_incr", str(transcript), state_dir=tmp_path)
+        result2 = await capture_new_messages(db, "capture_incr", str(transcript_base), state_dir=tmp_path)
         assert result2["captured"] == 1
 
         count = await count_messages(db, "capture_incr")
-        assert count == 2
+        assert count == 3
 
     async def test_capture_missing_file(self, db):
         result = await capture_new_messages(db, "capture_missing", "/nonexistent.jsonl")
@@ -143,16 +134,19 @@ class TestInjection:
         assert "lcm_expand" in text
 
     async def test_injection_respects_token_limit(self, db):
-        # Create a large summary
+        # The budget runs on the stored token_estimate, so short content
+        # with an explicit estimate exercises the limit branch without
+        # pushing 20KB strings through the formatter
         await create_leaf_summary(
-            db, "s1", "X" * 20000,  # ~5000 tokens
-            msg_start_id=1, msg_end_id=10,
+            db, "s1", "Fits in the budget",
+            msg_start_id=1, msg_end_id=10, token_estimate=1500,
         )
         await create_leaf_summary(
-            db, "s1", "Y" * 20000,
-            msg_start_id=11, msg_end_id=20,
+            db, "s1", "Too big for the budget",
+            msg_start_id=11, msg_end_id=20, token_estimate=5000,
         )
 
         text = await build_injection_text(db, "s1", max_tokens=2000)
-        # Should not include all content
-        assert len(text) < 25000
+        assert "Fits in the budget" in text
+        assert "Too big for the budget" not in text
+        assert "1 more summaries available" in text
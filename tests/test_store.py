@@ -3,9 +3,8 @@
 from __future__ import annotations
 
 import pytest
-import aiosqlite
 
-from lcm.store.database import get_db
+from lcm.store.database import transaction
 from lcm.store.messages import (
     count_messages,
     get_message,
@@ -37,15 +36,6 @@ from lcm.store.files import (
 )
 
 
-@pytest.fixture
-async def db(tmp_path):
-    """Create a fresh test database."""
-    db_path = tmp_path / "test.db"
-    conn = await get_db(db_path)
-    yield conn
-    await conn.close()
-
-
 # --- Message Tests ---
 
 
@@ -127,6 +117,19 @@ class TestMessages:
         assert len(unsummarized) == 1
         assert unsummarized[0].id == id3
 
+    async def test_transaction_batches_inserts(self, db):
+        async with transaction(db):
+            for i in range(3):
+                await insert_message(db, "s1", "user", f"Msg {i}", commit=False)
+        assert await count_messages(db, "s1") == 3
+
+    async def test_transaction_rolls_back_on_error(self, db):
+        with pytest.raises(RuntimeError):
+            async with transaction(db):
+                await insert_message(db, "s1", "user", "Doomed", commit=False)
+                raise RuntimeError("abort")
+        assert await count_messages(db, "s1") == 0
+
 
 # --- Summary Tests ---
 
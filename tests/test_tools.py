@@ -4,12 +4,11 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from lcm.store.database import get_db
 from lcm.store.messages import insert_message
+from tests.conftest import bulk_insert
 from lcm.store.summaries import create_condensed_summary, create_leaf_summary
 from lcm.store.files import store_file_ref
 from lcm.tools.memory import lcm_describe, lcm_expand, lcm_grep
@@ -17,14 +16,6 @@ from lcm.tools.operators import llm_map, agentic_map
 from lcm.tools.status import lcm_status
 
 
-@pytest.fixture
-async def db(tmp_path):
-    db_path = tmp_path / "test.db"
-    conn = await get_db(db_path)
-    yield conn
-    await conn.close()
-
-
 # --- lcm_grep Tests ---
 
 
@@ -55,8 +46,9 @@ class TestLcmGrep:
         assert len(result["results"]) > 0
 
     async def test_pagination(self, db):
-        for i in range(25):
-            await insert_message(db, "s1", "user", f"Search term item {i}")
+        await bulk_insert(
+            db, "s1", [("user", f"Search term item {i}") for i in range(25)]
+        )
 
         page1 = await lcm_grep(db, "Search term", page=1)
         page2 = await lcm_grep(db, "Search term", page=2)
@@ -122,11 +114,11 @@ class TestLcmExpand:
         assert "error" in result
 
     async def test_expand_pagination(self, db):
-        ids = []
-        for i in range(15):
-            ids.append(await insert_message(db, "s1", "user", f"Msg {i}"))
+        first, last = await bulk_insert(
+            db, "s1", [("user", f"Msg {i}") for i in range(15)]
+        )
 
-        sid = await create_leaf_summary(db, "s1", "Lots", msg_start_id=ids[0], msg_end_id=ids[-1])
+        sid = await create_leaf_summary(db, "s1", "Lots", msg_start_id=first, msg_end_id=last)
 
         page1 = await lcm_expand(db, sid, page=1)
         assert len(page1["messages"]) == 10
@@ -161,9 +153,11 @@ class TestLcmStatus:
 
 
 class TestLlmMap:
-    @patch("lcm.tools.operators.classify")
-    async def test_llm_map_basic(self, mock_classify, tmp_path):
-        mock_classify.return_value = {"label": "positive"}
+    async def test_llm_map_basic(self, monkeypatch, tmp_path):
+        async def fake_classify(item, prompt, output_schema):
+            return {"label": "positive"}
+
+        monkeypatch.setattr("lcm.tools.operators.classify", fake_classify)
 
         input_file = tmp_path / "input.jsonl"
         input_file.write_text(
@@ -182,18 +176,13 @@ class TestLlmMap:
         assert result["failed"] == 0
         assert Path(result["output_path"]).exists()
 
-    @patch("lcm.tools.operators.classify")
-    async def test_llm_map_with_failures(self, mock_classify, tmp_path):
-        call_count = 0
-
-        async def side_effect(item, prompt, output_schema):
-            nonlocal call_count
-            call_count += 1
-            if call_count <= 3:  # First item fails all 3 retries
+    async def test_llm_map_with_failures(self, monkeypatch, tmp_path):
+        async def fake_classify(item, prompt, output_schema):
+            if item["text"] == "fail":  # First item fails all 3 retries
                 raise Exception("API error")
             return {"label": "ok"}
 
-        mock_classify.side_effect = side_effect
+        monkeypatch.setattr("lcm.tools.operators.classify", fake_classify)
 
         input_file = tmp_path / "input.jsonl"
         input_file.write_text(
@@ -209,6 +198,36 @@ class TestLlmMap:
         assert result["failed"] == 1
         assert result["successful"] == 1
 
+    async def test_llm_map_batched(self, monkeypatch, tmp_path):
+        calls = {"batch": 0, "single": 0}
+
+        async def fake_batch(items, prompt, output_schema):
+            calls["batch"] += 1
+            return [{"label": "ok"} for _ in items]
+
+        async def fake_classify(item, prompt, output_schema):
+            calls["single"] += 1
+            return {"label": "ok"}
+
+        monkeypatch.setattr("lcm.tools.operators.classify_batch", fake_batch)
+        monkeypatch.setattr("lcm.tools.operators.classify", fake_classify)
+
+        input_file = tmp_path / "input.jsonl"
+        input_file.write_text(
+            "".join(json.dumps({"text": f"item {i}"}) + "\n" for i in range(5))
+        )
+
+        result = await llm_map(
+            input_path=str(input_file),
+            prompt="Classify sentiment",
+            batch_size=2,
+        )
+
+        assert result["successful"] == 5
+        assert result["failed"] == 0
+        assert calls["batch"] == 2  # Two full batches of 2
+        assert calls["single"] == 1  # The odd item out
+
     async def test_llm_map_missing_file(self):
         result = await llm_map(
             input_path="/nonexistent.jsonl",
@@ -221,9 +240,11 @@ class TestLlmMap:
 
 
 class TestAgenticMap:
-    @patch("lcm.tools.operators.agent_loop")
-    async def test_agentic_map_basic(self, mock_agent, tmp_path):
-        mock_agent.return_value = {"analysis": "done"}
+    async def test_agentic_map_basic(self, monkeypatch, tmp_path):
+        async def fake_agent_loop(item, prompt, output_schema, read_only):
+            return {"analysis": "done"}
+
+        monkeypatch.setattr("lcm.tools.operators.agent_loop", fake_agent_loop)
 
         input_file = tmp_path / "input.jsonl"
         input_file.write_text('{"file": "test.py"}\n')